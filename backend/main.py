@@ -5,6 +5,7 @@ Unified backend server for auth, RAG, personalization, and translation
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 import os
 from dotenv import load_dotenv
@@ -16,24 +17,29 @@ load_dotenv()
 from server.agents.routes import router as agents_router
 from server.auth.routes import router as auth_router
 from server.personalize.routes import router as personalize_router
-from server.translate.routes import router as translate_router
+from server.translate.routes import router as translate_router, translator
 from server.rag.routes import router as rag_router
+from server.log_queue import queue_logging
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
-    print("Starting Physical AI Textbook API Server...")
-    print(f"Environment: {os.getenv('NODE_ENV', 'development')}")
-    print(f"CORS Origins: {os.getenv('ALLOWED_ORIGINS', 'http://localhost:3000')}")
-    yield
-    print("Shutting down server...")
+    # Log records are written by a background thread, off the event loop
+    with queue_logging():
+        print("Starting Physical AI Textbook API Server...")
+        print(f"Environment: {os.getenv('NODE_ENV', 'development')}")
+        print(f"CORS Origins: {os.getenv('ALLOWED_ORIGINS', 'http://localhost:3000')}")
+        yield
+        print("Shutting down server...")
+        await translator.aclose()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Physical AI Textbook API",
     description="Backend for personalized, multilingual robotics textbook with RAG chatbot",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -0,0 +1,37 @@
+"""
+Chapter Loader - Async chapter file reads with an in-process LRU cache
+Entries are checked against the file's mtime so edited chapters are re-read
+"""
+
+import os
+from collections import OrderedDict
+from typing import Tuple
+
+import aiofiles
+
+CHAPTER_CACHE_SIZE = 256
+
+# chapter_path -> (mtime, content), least recently used first
+_chapter_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+async def load_chapter(chapter_path: str) -> str:
+    """
+    Read a chapter file without blocking the event loop
+    Raises FileNotFoundError if the chapter does not exist
+    """
+    mtime = os.stat(chapter_path).st_mtime
+
+    cached = _chapter_cache.get(chapter_path)
+    if cached and cached[0] == mtime:
+        _chapter_cache.move_to_end(chapter_path)
+        return cached[1]
+
+    async with aiofiles.open(chapter_path, 'r', encoding='utf-8') as f:
+        content = await f.read()
+
+    _chapter_cache[chapter_path] = (mtime, content)
+    _chapter_cache.move_to_end(chapter_path)
+    if len(_chapter_cache) > CHAPTER_CACHE_SIZE:
+        _chapter_cache.popitem(last=False)
+
+    return content
@@ -4,7 +4,7 @@ Stores chat history and user interactions
 """
 
 import os
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -53,6 +53,11 @@ class PersonalizationCache(Base):
     personalized_content = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # One cached variant per (user, chapter, difficulty); also serves the lookup index
+    __table_args__ = (
+        UniqueConstraint('user_id', 'chapter', 'difficulty_level', name='uq_pers_cache'),
+    )
+
 # Create tables
 def init_db():
     Base.metadata.create_all(bind=engine)
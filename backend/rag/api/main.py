@@ -6,10 +6,14 @@ Provides endpoints for document embedding, querying, and chat
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from typing import List, Optional
+from datetime import datetime
 import os
 from dotenv import load_dotenv
 
+from .chapters import load_chapter
+
 # Try to import RAG engine and OpenAI agent (optional)
 try:
     from .rag_engine import RAGEngine
@@ -334,9 +338,8 @@ async def personalize_chapter(request: PersonalizeRequest, db=Depends(get_db)):
         # Load chapter content
         chapter_path = f"./docs/{request.chapter}.md"
         try:
-            with open(chapter_path, 'r', encoding='utf-8') as f:
-                chapter_content = f.read()
-        except:
+            chapter_content = await load_chapter(chapter_path)
+        except FileNotFoundError:
             raise HTTPException(status_code=404, detail="Chapter not found")
 
         # Personalize
@@ -353,14 +356,21 @@ async def personalize_chapter(request: PersonalizeRequest, db=Depends(get_db)):
             difficulty=request.difficulty
         )
 
-        # Cache the result
-        cache_entry = PersonalizationCache(
+        # Cache the result (upsert on the unique cache key)
+        cache_stmt = pg_insert(PersonalizationCache).values(
             user_id=request.user_id,
             chapter=request.chapter,
             difficulty_level=request.difficulty or 'auto',
             personalized_content=personalized
         )
-        db.add(cache_entry)
+        cache_stmt = cache_stmt.on_conflict_do_update(
+            constraint='uq_pers_cache',
+            set_={
+                'personalized_content': cache_stmt.excluded.personalized_content,
+                'created_at': datetime.utcnow()
+            }
+        )
+        db.execute(cache_stmt)
         db.commit()
 
         return {
@@ -384,9 +394,8 @@ async def translate_chapter(request: TranslateRequest):
         # Load chapter content
         chapter_path = f"./docs/{request.chapter}.md"
         try:
-            with open(chapter_path, 'r', encoding='utf-8') as f:
-                chapter_content = f.read()
-        except:
+            chapter_content = await load_chapter(chapter_path)
+        except FileNotFoundError:
             raise HTTPException(status_code=404, detail="Chapter not found")
 
         # Use Gemini to translate
@@ -431,25 +440,24 @@ async def update_user_profile(profile: UserProfileUpdate, db=Depends(get_db)):
     Update or create user profile for personalization
     """
     try:
-        existing = db.query(UserProfile).filter(
-            UserProfile.user_id == profile.user_id
-        ).first()
-
-        if existing:
-            existing.education_level = profile.education_level
-            existing.programming_background = profile.programming_background
-            existing.math_background = profile.math_background
-            existing.hardware_background = profile.hardware_background
-        else:
-            new_profile = UserProfile(
-                user_id=profile.user_id,
-                education_level=profile.education_level,
-                programming_background=profile.programming_background,
-                math_background=profile.math_background,
-                hardware_background=profile.hardware_background
-            )
-            db.add(new_profile)
-
+        profile_stmt = pg_insert(UserProfile).values(
+            user_id=profile.user_id,
+            education_level=profile.education_level,
+            programming_background=profile.programming_background,
+            math_background=profile.math_background,
+            hardware_background=profile.hardware_background
+        )
+        profile_stmt = profile_stmt.on_conflict_do_update(
+            index_elements=[UserProfile.user_id],
+            set_={
+                'education_level': profile_stmt.excluded.education_level,
+                'programming_background': profile_stmt.excluded.programming_background,
+                'math_background': profile_stmt.excluded.math_background,
+                'hardware_background': profile_stmt.excluded.hardware_background,
+                'updated_at': datetime.utcnow()
+            }
+        )
+        db.execute(profile_stmt)
         db.commit()
 
         return {"status": "success", "message": "Profile updated"}
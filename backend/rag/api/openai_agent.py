@@ -3,17 +3,43 @@ OpenAI RAG Agent - Uses OpenAI ChatCompletions with retrieval
 Handles question answering with citations from the textbook
 """
 
+from functools import lru_cache
 from typing import List, Dict, Optional
 from openai import OpenAI
+import tiktoken
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.semantic_cache import SemanticCache
+
+# Default cap on retrieved context tokens sent to the model
+CONTEXT_TOKEN_BUDGET = 6000
+
+# Characters TextSplitter repeats from the end of one chunk at the start of the next
+CHUNK_OVERLAP = 200
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str) -> tiktoken.Encoding:
+    """Get (and cache) the tokenizer for a model"""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
 
 class OpenAIRAGAgent:
-    def __init__(self, api_key: str, rag_engine):
+    def __init__(self, api_key: str, rag_engine, context_token_budget: int = CONTEXT_TOKEN_BUDGET):
         """
         Initialize OpenAI Agent with RAG capabilities
         """
         self.client = OpenAI(api_key=api_key)
         self.rag_engine = rag_engine
         self.model = "gpt-4o-mini"
+        self.context_token_budget = context_token_budget
+
+        # Answers for near-identical questions; one bounded cache, entries keyed by chapter filter
+        self.answer_cache = SemanticCache(dim=rag_engine.embedding_dim)
 
         self.system_prompt = """You are an expert AI teaching assistant for the Physical AI & Humanoid Robotics textbook.
 
@@ -33,31 +59,88 @@ Guidelines:
 
 Always cite your sources using the chapter and section information provided in the context."""
 
+    def _dedupe(self, docs: List[Dict]) -> List[Dict]:
+        """
+        Remove text repeated across retrieved chunks
+        A chunk wholly contained in an earlier one is dropped; a chunk whose opening overlap
+        window appears in an earlier one (TextSplitter neighbours) has that window trimmed
+        Docs arrive sorted by score, so the highest-scoring copy is kept
+        """
+        kept = []
+
+        for doc in docs:
+            text = doc['text']
+            if any(text in other['text'] for other in kept):
+                continue
+
+            if any(text[:CHUNK_OVERLAP] in other['text'] for other in kept):
+                text = text[CHUNK_OVERLAP:].lstrip()
+                if not text:
+                    continue
+                doc = {**doc, 'text': text}
+
+            kept.append(doc)
+
+        return kept
+
+    def _fit_to_budget(self, docs: List[Dict]) -> List[Dict]:
+        """
+        Keep retrieved docs within the context token budget
+        The doc that crosses the budget is cut at a token boundary, the rest are dropped
+        """
+        encoding = _get_encoding(self.model)
+        remaining = self.context_token_budget
+        fitted = []
+
+        for doc in docs:
+            tokens = encoding.encode(doc['text'])
+            if len(tokens) <= remaining:
+                fitted.append(doc)
+                remaining -= len(tokens)
+                continue
+
+            if remaining > 0:
+                fitted.append({**doc, 'text': encoding.decode(tokens[:remaining])})
+            break
+
+        return fitted
+
     async def ask(self, question: str, chapter: Optional[str] = None, user_id: str = "anonymous") -> Dict:
         """
         Ask a question and get AI-generated answer with RAG
         """
+        # Embed once for both the answer cache and retrieval
+        query_embedding = self.rag_engine.get_embedding(question)
+
+        cached = self.answer_cache.lookup(query_embedding, key=chapter)
+        if cached:
+            return {**cached, 'question': question}
+
         # Retrieve relevant context
         relevant_docs = await self.rag_engine.query(
             question=question,
             top_k=5,
-            chapter=chapter
+            chapter=chapter,
+            query_embedding=query_embedding
         )
+        relevant_docs = self._fit_to_budget(self._dedupe(relevant_docs))
 
         # Build context from retrieved documents
         context_parts = []
         sources = []
 
-        for idx, doc in enumerate(relevant_docs):
-            context_parts.append(
-                f"[Source {idx+1}] From {doc['metadata'].get('title', 'Unknown')}:\n{doc['text']}"
-            )
+        for idx, doc in enumerate(relevant_docs, 1):
+            metadata = doc['metadata']
+            title = metadata.get('title', 'Unknown')
+            text = doc['text']
+
+            context_parts.append(f"[Source {idx}] From {title}:\n{text}")
             sources.append({
-                'title': doc['metadata'].get('title', 'Unknown'),
-                'chapter': doc['metadata'].get('chapter', 'Unknown'),
-                'file_path': doc['metadata'].get('file_path', ''),
+                'title': title,
+                'chapter': metadata.get('chapter', 'Unknown'),
+                'file_path': metadata.get('file_path', ''),
                 'relevance_score': doc['score'],
-                'excerpt': doc['text'][:200] + "..."
+                'excerpt': text[:200] + "..."
             })
 
         context = "\n\n".join(context_parts)
@@ -85,11 +168,14 @@ Please provide a comprehensive answer with references to the relevant chapters/s
 
         answer = response.choices[0].message.content
 
-        return {
+        result = {
             'answer': answer,
             'sources': sources,
             'question': question
         }
+        self.answer_cache.add(query_embedding, result, key=chapter)
+
+        return result
 
     async def ask_selected(self, selected_text: str, question: str, user_id: str = "anonymous") -> Dict:
         """
@@ -132,6 +218,7 @@ Question about this text: {question}"""
             top_k=10,
             chapter=chapter
         )
+        relevant_docs = self._fit_to_budget(self._dedupe(relevant_docs))
 
         # Build context
         context = "\n".join([doc['text'] for doc in relevant_docs])
@@ -175,6 +262,7 @@ Explanation: [why this is correct]"""}
             question=concept,
             top_k=3
         )
+        relevant_docs = self._fit_to_budget(self._dedupe(relevant_docs))
 
         context = "\n".join([doc['text'] for doc in relevant_docs])
 
@@ -4,10 +4,13 @@ Personalization API endpoints
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from typing import Optional
+from datetime import datetime
 import os
 
 from .database import get_db, UserProfile, PersonalizationCache
+from .chapters import load_chapter
 from personalization.personalization_engine import PersonalizationEngine
 
 router = APIRouter(prefix="/personalization", tags=["personalization"])
@@ -63,9 +66,8 @@ async def personalize_chapter(request: PersonalizeRequest, db=Depends(get_db)):
         # Load chapter content (simplified - in practice load from file)
         chapter_path = f"./docs/{request.chapter}.md"
         try:
-            with open(chapter_path, 'r', encoding='utf-8') as f:
-                chapter_content = f.read()
-        except:
+            chapter_content = await load_chapter(chapter_path)
+        except FileNotFoundError:
             raise HTTPException(status_code=404, detail="Chapter not found")
 
         # Personalize
@@ -82,14 +84,21 @@ async def personalize_chapter(request: PersonalizeRequest, db=Depends(get_db)):
             difficulty=request.difficulty
         )
 
-        # Cache the result
-        cache_entry = PersonalizationCache(
+        # Cache the result (upsert on the unique cache key)
+        cache_stmt = pg_insert(PersonalizationCache).values(
             user_id=request.user_id,
             chapter=request.chapter,
             difficulty_level=request.difficulty or 'auto',
             personalized_content=personalized
         )
-        db.add(cache_entry)
+        cache_stmt = cache_stmt.on_conflict_do_update(
+            constraint='uq_pers_cache',
+            set_={
+                'personalized_content': cache_stmt.excluded.personalized_content,
+                'created_at': datetime.utcnow()
+            }
+        )
+        db.execute(cache_stmt)
         db.commit()
 
         return {
@@ -98,6 +107,8 @@ async def personalize_chapter(request: PersonalizeRequest, db=Depends(get_db)):
             "cached": False
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -107,25 +118,24 @@ async def update_user_profile(profile: UserProfileUpdate, db=Depends(get_db)):
     Update or create user profile
     """
     try:
-        existing = db.query(UserProfile).filter(
-            UserProfile.user_id == profile.user_id
-        ).first()
-
-        if existing:
-            existing.education_level = profile.education_level
-            existing.programming_background = profile.programming_background
-            existing.math_background = profile.math_background
-            existing.hardware_background = profile.hardware_background
-        else:
-            new_profile = UserProfile(
-                user_id=profile.user_id,
-                education_level=profile.education_level,
-                programming_background=profile.programming_background,
-                math_background=profile.math_background,
-                hardware_background=profile.hardware_background
-            )
-            db.add(new_profile)
-
+        profile_stmt = pg_insert(UserProfile).values(
+            user_id=profile.user_id,
+            education_level=profile.education_level,
+            programming_background=profile.programming_background,
+            math_background=profile.math_background,
+            hardware_background=profile.hardware_background
+        )
+        profile_stmt = profile_stmt.on_conflict_do_update(
+            index_elements=[UserProfile.user_id],
+            set_={
+                'education_level': profile_stmt.excluded.education_level,
+                'programming_background': profile_stmt.excluded.programming_background,
+                'math_background': profile_stmt.excluded.math_background,
+                'hardware_background': profile_stmt.excluded.hardware_background,
+                'updated_at': datetime.utcnow()
+            }
+        )
+        db.execute(profile_stmt)
         db.commit()
 
         return {"status": "success", "message": "Profile updated"}
@@ -4,9 +4,16 @@ Integrates with Qdrant for vector storage and OpenAI for embeddings
 """
 
 import os
-from typing import List, Dict
+from typing import List, Dict, Optional
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import (
+    Distance,
+    VectorParams,
+    PointStruct,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType
+)
 from openai import OpenAI
 import hashlib
 
@@ -46,6 +53,15 @@ class RAGEngine:
                     vectors_config=VectorParams(
                         size=self.embedding_dim,
                         distance=Distance.COSINE
+                    ),
+                    # int8 copies of the vectors kept in RAM for search;
+                    # full-precision vectors are kept for rescoring
+                    quantization_config=ScalarQuantization(
+                        scalar=ScalarQuantizationConfig(
+                            type=ScalarType.INT8,
+                            quantile=0.99,
+                            always_ram=True
+                        )
                     )
                 )
                 print(f"Created collection: {self.collection_name}")
@@ -133,12 +149,20 @@ class RAGEngine:
             'status': 'success'
         }
 
-    async def query(self, question: str, top_k: int = 5, chapter: str = None) -> List[Dict]:
+    async def query(
+        self,
+        question: str,
+        top_k: int = 5,
+        chapter: str = None,
+        query_embedding: Optional[List[float]] = None
+    ) -> List[Dict]:
         """
         Query vector database for relevant chunks
+        Pass query_embedding to reuse an embedding the caller already computed
         """
         # Get embedding for question
-        query_embedding = self.get_embedding(question)
+        if query_embedding is None:
+            query_embedding = self.get_embedding(question)
 
         # Build filter if chapter specified
         query_filter = None
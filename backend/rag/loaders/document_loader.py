@@ -4,8 +4,12 @@ Extracts metadata and content for embedding
 """
 
 import os
-from typing import List, Dict
+from typing import List, Dict, Tuple, Iterator
 import re
+import yaml
+
+# Prefer libyaml's C loader when available
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 class DocumentLoader:
     def __init__(self, docs_path: str):
@@ -21,16 +25,25 @@ class DocumentLoader:
         """
         documents = []
 
-        for root, dirs, files in os.walk(self.docs_path):
-            for file in files:
-                if file.endswith('.md') or file.endswith('.mdx'):
-                    file_path = os.path.join(root, file)
-                    doc = self.load_markdown_file(file_path)
-                    if doc:
-                        documents.append(doc)
+        for file_path in self._iter_markdown_files(self.docs_path):
+            doc = self.load_markdown_file(file_path)
+            if doc:
+                documents.append(doc)
 
         return documents
 
+    def _iter_markdown_files(self, path: str) -> Iterator[str]:
+        """
+        Yield markdown file paths under path
+        DirEntry caches file type, so no extra stat per entry
+        """
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self._iter_markdown_files(entry.path)
+                elif entry.name.endswith(('.md', '.mdx')) and entry.is_file():
+                    yield entry.path
+
     def load_markdown_file(self, file_path: str) -> Dict:
         """
         Load a single markdown file and extract metadata
@@ -39,11 +52,8 @@ class DocumentLoader:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
 
-            # Extract frontmatter metadata
-            metadata = self.extract_frontmatter(content)
-
-            # Remove frontmatter from content
-            content_without_frontmatter = self.remove_frontmatter(content)
+            # Split frontmatter metadata from content in one pass
+            metadata, content_without_frontmatter = self.split_frontmatter(content)
 
             # Extract title if not in metadata
             if 'title' not in metadata:
@@ -69,26 +79,47 @@ class DocumentLoader:
             print(f"Error loading {file_path}: {e}")
             return None
 
-    def extract_frontmatter(self, content: str) -> Dict:
+    def split_frontmatter(self, content: str) -> Tuple[Dict, str]:
         """
-        Extract YAML frontmatter from markdown
+        Split YAML frontmatter from markdown
+        Only the head of the file is scanned, since frontmatter must come first
         """
-        metadata = {}
+        if not content.startswith('---\n'):
+            return {}, content
 
-        frontmatter_match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
-        if frontmatter_match:
-            frontmatter_text = frontmatter_match.group(1)
+        end = content.find('\n---\n', 3)
+        if end < 0:
+            return {}, content
 
-            # Parse simple key: value pairs
-            for line in frontmatter_text.split('\n'):
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    metadata[key.strip()] = value.strip()
+        return self._parse_frontmatter(content[4:end]), content[end + 5:]
+
+    def _parse_frontmatter(self, frontmatter_text: str) -> Dict:
+        """
+        Parse frontmatter as YAML, falling back to simple key: value pairs
+        """
+        try:
+            metadata = yaml.load(frontmatter_text, Loader=_YAML_LOADER)
+            if isinstance(metadata, dict):
+                return metadata
+        except yaml.YAMLError:
+            pass
+
+        metadata = {}
+        for line in frontmatter_text.split('\n'):
+            if ':' in line:
+                key, value = line.split(':', 1)
+                metadata[key.strip()] = value.strip()
 
         return metadata
 
+    def extract_frontmatter(self, content: str) -> Dict:
+        """
+        Extract YAML frontmatter from markdown
+        """
+        return self.split_frontmatter(content)[0]
+
     def remove_frontmatter(self, content: str) -> str:
         """
         Remove YAML frontmatter from content
         """
-        return re.sub(r'^---\s*\n.*?\n---\s*\n', '', content, flags=re.DOTALL)
+        return self.split_frontmatter(content)[1]
@@ -0,0 +1,20 @@
+-- Migration: Unique key on personalization_cache
+-- Purpose: Back the ON CONFLICT ON CONSTRAINT uq_pers_cache upserts in the RAG API;
+--          create_all does not alter tables that already exist
+-- Date: 2026-10-15
+
+-- Existing duplicates would block the constraint; keep the newest row of each key
+DELETE FROM personalization_cache a
+USING personalization_cache b
+WHERE a.user_id = b.user_id
+  AND a.chapter = b.chapter
+  AND a.difficulty_level = b.difficulty_level
+  AND a.id < b.id;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_pers_cache') THEN
+        ALTER TABLE personalization_cache
+        ADD CONSTRAINT uq_pers_cache UNIQUE (user_id, chapter, difficulty_level);
+    END IF;
+END $$;
@@ -0,0 +1,62 @@
+"""
+Tests for the semantic answer cache
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.semantic_cache import SemanticCache
+
+
+def _unit(index: int, dim: int = 8) -> np.ndarray:
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[index] = 1.0
+    return vector
+
+
+def test_empty_cache_misses():
+    cache = SemanticCache(dim=8)
+    assert cache.lookup(_unit(0)) is None
+
+
+def test_near_identical_embedding_hits():
+    cache = SemanticCache(dim=8, threshold=0.95)
+    cache.add(_unit(0), "answer")
+
+    nearby = _unit(0) + 0.01 * _unit(1)
+    assert cache.lookup(nearby) == "answer"
+    assert cache.lookup(_unit(1)) is None
+
+
+def test_entries_only_match_their_key():
+    cache = SemanticCache(dim=8)
+    cache.add(_unit(0), "chapter-01 answer", key="chapter-01")
+    cache.add(_unit(0), "unfiltered answer")
+
+    assert cache.lookup(_unit(0), key="chapter-01") == "chapter-01 answer"
+    assert cache.lookup(_unit(0)) == "unfiltered answer"
+    assert cache.lookup(_unit(0), key="chapter-02") is None
+
+
+def test_oldest_entry_is_overwritten_when_full():
+    cache = SemanticCache(dim=8, max_entries=2)
+    for index in range(3):
+        cache.add(_unit(index), index, key="chapter-01")
+
+    assert len(cache) == 2
+    assert cache.lookup(_unit(0), key="chapter-01") is None
+    assert cache.lookup(_unit(1), key="chapter-01") == 1
+    assert cache.lookup(_unit(2), key="chapter-01") == 2
+
+
+def test_growth_keeps_keys_aligned():
+    cache = SemanticCache(dim=8, max_entries=200)
+    for index in range(100):
+        cache.add(_unit(index % 8), index, key=f"chapter-{index}")
+
+    assert cache.lookup(_unit(99 % 8), key="chapter-99") == 99
+    assert cache.lookup(_unit(5), key="chapter-5") == 5
@@ -0,0 +1,81 @@
+"""
+Semantic Cache - Reuses results for queries with near-identical embeddings
+Cached embeddings live in one contiguous float32 matrix so a lookup is a single matmul
+Entries carry a key (e.g. a chapter filter) and only match lookups with the same key
+"""
+
+import numpy as np
+from typing import Any, Hashable, List, Optional
+
+class SemanticCache:
+    def __init__(self, dim: int = 1536, max_entries: int = 10000, threshold: float = 0.95):
+        """
+        Initialize semantic cache
+        dim: Embedding dimension
+        max_entries: Capacity; the oldest entry is overwritten once full
+        threshold: Minimum cosine similarity for a cache hit
+        """
+        self.dim = dim
+        self.max_entries = max_entries
+        self.threshold = threshold
+
+        self._matrix = np.empty((0, dim), dtype=np.float32)
+        self._key_hashes = np.empty(0, dtype=np.int64)
+        self._keys: List[Hashable] = []
+        self._payloads: List[Any] = []
+        self._size = 0
+        self._next_slot = 0
+
+    def _normalize(self, embedding) -> np.ndarray:
+        """Convert to a unit-length float32 vector"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, embedding, key: Hashable = None) -> Optional[Any]:
+        """
+        Return the payload of the most similar embedding cached under key, if above threshold
+        """
+        if not self._size:
+            return None
+
+        similarities = self._matrix[:self._size] @ self._normalize(embedding)
+        # Entries cached under another key never match
+        similarities[self._key_hashes[:self._size] != hash(key)] = -np.inf
+        best = int(np.argmax(similarities))
+
+        # The key comparison guards against hash collisions
+        if similarities[best] >= self.threshold and self._keys[best] == key:
+            return self._payloads[best]
+        return None
+
+    def add(self, embedding, payload: Any, key: Hashable = None):
+        """
+        Cache a payload under its embedding and key
+        """
+        vector = self._normalize(embedding)
+
+        if self._size < self.max_entries:
+            # Grow the matrix geometrically up to max_entries
+            if self._size == len(self._matrix):
+                capacity = min(max(2 * len(self._matrix), 64), self.max_entries)
+                grown = np.empty((capacity, self.dim), dtype=np.float32)
+                grown[:self._size] = self._matrix[:self._size]
+                self._matrix = grown
+                self._key_hashes = np.resize(self._key_hashes, capacity)
+
+            slot = self._size
+            self._size += 1
+            self._keys.append(key)
+            self._payloads.append(payload)
+        else:
+            slot = self._next_slot
+            self._next_slot = (self._next_slot + 1) % self.max_entries
+            self._keys[slot] = key
+            self._payloads[slot] = payload
+
+        self._matrix[slot] = vector
+        self._key_hashes[slot] = hash(key)
+
+    def __len__(self) -> int:
+        return self._size
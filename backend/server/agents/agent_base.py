@@ -6,17 +6,42 @@ Handles spec validation, AI invocation, and response formatting
 import yaml
 import json
 import time
+import jinja2
+from pydantic import BaseModel, Field, StrictInt, StrictStr, ValidationError, create_model
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple, Type, Literal
 from datetime import datetime
 import os
 
+# Shared Jinja2 environment for prompt templates (None renders as empty string)
+_JINJA_ENV = jinja2.Environment(
+    autoescape=False,
+    trim_blocks=True,
+    lstrip_blocks=True,
+    finalize=lambda value: '' if value is None else value
+)
+
+# Spec input types mapped to strict pydantic types
+_SPEC_TYPES = {
+    'string': StrictStr,
+    'integer': StrictInt,
+    'array': list
+}
+
 class AgentBase:
     """Base class for all Claude Code agents"""
 
+    # Compiled prompt templates keyed by (agent_name, spec_mtime)
+    _template_cache: Dict[Tuple[str, float], jinja2.Template] = {}
+    # Input validation models keyed by (agent_name, spec_mtime)
+    _input_model_cache: Dict[Tuple[str, float], Type[BaseModel]] = {}
+
     def __init__(self, agent_name: str, api_key: Optional[str] = None):
         self.agent_name = agent_name
+        self.spec_path = Path(__file__).parent.parent.parent / "spec" / "agents" / f"{agent_name}.yaml"
         self.spec = self._load_spec()
+        self._template = self._compile_template()
+        self._input_model = self._build_input_model()
         self.api_key = api_key or os.getenv('OPENAI_API_KEY') or os.getenv('CLAUDE_API_KEY')
 
         if not self.api_key:
@@ -24,87 +49,91 @@ class AgentBase:
 
     def _load_spec(self) -> Dict[str, Any]:
         """Load agent specification from YAML file"""
-        spec_path = Path(__file__).parent.parent.parent / "spec" / "agents" / f"{self.agent_name}.yaml"
-
-        if not spec_path.exists():
-            raise FileNotFoundError(f"Agent spec not found: {spec_path}")
+        if not self.spec_path.exists():
+            raise FileNotFoundError(f"Agent spec not found: {self.spec_path}")
 
-        with open(spec_path, 'r') as f:
+        with open(self.spec_path, 'r') as f:
             return yaml.safe_load(f)
 
-    def validate_input(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
-        """Validate inputs against spec"""
-        spec_inputs = self.spec.get('inputs', {})
-        validated = {}
+    def _compile_template(self) -> jinja2.Template:
+        """Compile the spec's prompt template once per spec version"""
+        cache_key = (self.agent_name, self.spec_path.stat().st_mtime)
+        template = AgentBase._template_cache.get(cache_key)
 
-        for field_name, field_spec in spec_inputs.items():
-            value = inputs.get(field_name)
+        if template is None:
+            template = _JINJA_ENV.from_string(self.spec.get('prompt_template', ''))
+            AgentBase._template_cache[cache_key] = template
 
-            # Check required fields
-            if field_spec.get('required', False) and value is None:
-                raise ValueError(f"Required field missing: {field_name}")
+        return template
 
-            # Use default if not provided
-            if value is None and 'default' in field_spec:
-                value = field_spec['default']
+    def _build_input_model(self) -> Type[BaseModel]:
+        """Build a pydantic model from the spec's inputs once per spec version"""
+        cache_key = (self.agent_name, self.spec_path.stat().st_mtime)
+        model = AgentBase._input_model_cache.get(cache_key)
 
-            # Type validation (basic)
-            if value is not None:
+        if model is None:
+            fields = {}
+            for field_name, field_spec in self.spec.get('inputs', {}).items():
                 expected_type = field_spec.get('type')
-                if expected_type == 'string' and not isinstance(value, str):
-                    raise ValueError(f"{field_name} must be string")
-                elif expected_type == 'integer' and not isinstance(value, int):
-                    raise ValueError(f"{field_name} must be integer")
-                elif expected_type == 'array' and not isinstance(value, list):
-                    raise ValueError(f"{field_name} must be array")
+                field_type = _SPEC_TYPES.get(expected_type, Any)
 
                 # Enum validation
-                if 'enum' in field_spec and value not in field_spec['enum']:
-                    raise ValueError(f"{field_name} must be one of {field_spec['enum']}")
+                if 'enum' in field_spec:
+                    field_type = Literal[tuple(field_spec['enum'])]
 
-                # Length validation for strings
+                constraints = {}
                 if expected_type == 'string' and 'max_length' in field_spec:
-                    if len(value) > field_spec['max_length']:
-                        raise ValueError(f"{field_name} exceeds max length {field_spec['max_length']}")
-
-                # Range validation for integers
+                    constraints['max_length'] = field_spec['max_length']
                 if expected_type == 'integer':
-                    if 'min' in field_spec and value < field_spec['min']:
-                        raise ValueError(f"{field_name} below minimum {field_spec['min']}")
-                    if 'max' in field_spec and value > field_spec['max']:
-                        raise ValueError(f"{field_name} above maximum {field_spec['max']}")
+                    if 'min' in field_spec:
+                        constraints['ge'] = field_spec['min']
+                    if 'max' in field_spec:
+                        constraints['le'] = field_spec['max']
+
+                if field_spec.get('required', False):
+                    fields[field_name] = (field_type, Field(..., **constraints))
+                else:
+                    fields[field_name] = (Optional[field_type], Field(field_spec.get('default'), **constraints))
+
+            model = create_model(f"{type(self).__name__}Input", **fields)
+            AgentBase._input_model_cache[cache_key] = model
 
-            validated[field_name] = value
+        return model
 
-        return validated
+    def _format_input_error(self, error: Dict[str, Any]) -> str:
+        """Turn the first pydantic validation error into a readable message"""
+        field_name = error['loc'][0]
+        field_spec = self.spec.get('inputs', {}).get(field_name, {})
+        error_type = error['type']
+
+        if error_type == 'missing':
+            return f"Required field missing: {field_name}"
+        if error_type == 'literal_error':
+            return f"{field_name} must be one of {field_spec.get('enum')}"
+        if error_type == 'string_too_long':
+            return f"{field_name} exceeds max length {field_spec.get('max_length')}"
+        if error_type == 'greater_than_equal':
+            return f"{field_name} below minimum {field_spec.get('min')}"
+        if error_type == 'less_than_equal':
+            return f"{field_name} above maximum {field_spec.get('max')}"
+
+        return f"{field_name} must be {field_spec.get('type')}"
+
+    def validate_input(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate inputs against spec"""
+        # None means "not provided" so defaults apply
+        provided = {key: value for key, value in inputs.items() if value is not None}
+
+        try:
+            validated = self._input_model(**provided)
+        except ValidationError as e:
+            raise ValueError(self._format_input_error(e.errors()[0]))
+
+        return validated.model_dump()
 
     def render_prompt(self, inputs: Dict[str, Any]) -> str:
-        """Render prompt template with inputs using Jinja2-like syntax"""
-        template = self.spec.get('prompt_template', '')
-
-        # Simple template rendering (for production, use Jinja2)
-        rendered = template
-        for key, value in inputs.items():
-            if value is not None:
-                # Handle arrays
-                if isinstance(value, list):
-                    rendered = rendered.replace(f"{{{{question_types | join(', ')}}}}", ", ".join(value))
-                    rendered = rendered.replace(f"{{{{{key}}}}}", str(value))
-                else:
-                    rendered = rendered.replace(f"{{{{{key}}}}}", str(value))
-
-        # Remove conditional blocks if variable not set (basic implementation)
-        import re
-        # Remove {% if var %}...{% endif %} blocks where var is not in inputs
-        for match in re.finditer(r'{%\s*if\s+(\w+)\s*%}(.*?){%\s*endif\s*%}', rendered, re.DOTALL):
-            var_name = match.group(1)
-            if var_name not in inputs or inputs[var_name] is None:
-                rendered = rendered.replace(match.group(0), '')
-            else:
-                # Keep content, remove tags
-                rendered = rendered.replace(match.group(0), match.group(2))
-
-        return rendered.strip()
+        """Render prompt template with inputs using Jinja2"""
+        return self._template.render(**inputs).strip()
 
     async def invoke_ai(self, prompt: str) -> str:
         """Invoke AI API (OpenAI or Claude) - to be implemented by subclasses or use default"""
@@ -3,7 +3,27 @@
 from .agent_base import AgentBase
 import json
 import re
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+
+# Precompiled patterns for response parsing
+_HEADER = re.compile(r'^[ \t]*(?:#|\*\*).*$', re.MULTILINE)
+_LINE_REF = re.compile(r'(?:Line\s+)?(\d+)[:\.\)]\s*`?([^`\-]+)`?\s*[-:]?\s*(.*)', re.IGNORECASE)
+_BULLET = re.compile(r'^[-*•]\s*')
+_NUMBERED = re.compile(r'^\d+\.\s*')
+
+def _section_for(header: str) -> Optional[str]:
+    """Map a lowercased header line to its section key, or None if it is not a section header"""
+    if 'overview' in header:
+        return 'overview'
+    if 'line' in header and 'by' in header:
+        return 'line_by_line'
+    if 'key concept' in header:
+        return 'key_concepts'
+    if 'pitfall' in header:
+        return 'common_pitfalls'
+    if 'modification' in header or 'variation' in header:
+        return 'suggested_modifications'
+    return None
 
 class CodeExplainerAgent(AgentBase):
     """Agent for explaining code snippets"""
@@ -22,65 +42,39 @@ class CodeExplainerAgent(AgentBase):
             'suggested_modifications': []
         }
 
-        # Split response into sections
+        # One scan over header lines; text before the first section header is the overview
         current_section = 'overview'
-        current_text = []
-
-        lines = ai_response.split('\n')
+        start = 0
+        for header in _HEADER.finditer(ai_response):
+            section = _section_for(header.group(0).lower())
+            if section is None:
+                continue
+            self._store_section(sections, current_section, ai_response[start:header.start()])
+            current_section = section
+            start = header.end()
 
-        for line in lines:
-            line_lower = line.lower().strip()
-
-            # Detect section headers
-            if 'overview' in line_lower and line.startswith(('#', '**', '##')):
-                if current_text:
-                    sections[current_section] = '\n'.join(current_text).strip()
-                current_section = 'overview'
-                current_text = []
-
-            elif 'line' in line_lower and 'by' in line_lower and line.startswith(('#', '**', '##')):
-                if current_text:
-                    sections['overview'] = '\n'.join(current_text).strip()
-                current_section = 'line_by_line'
-                current_text = []
-
-            elif 'key concept' in line_lower and line.startswith(('#', '**', '##')):
-                if current_text:
-                    sections['line_by_line'] = self._parse_line_by_line('\n'.join(current_text))
-                current_section = 'key_concepts'
-                current_text = []
-
-            elif 'pitfall' in line_lower and line.startswith(('#', '**', '##')):
-                if current_text:
-                    sections['key_concepts'] = self._parse_key_concepts('\n'.join(current_text))
-                current_section = 'common_pitfalls'
-                current_text = []
-
-            elif 'modification' in line_lower or 'variation' in line_lower and line.startswith(('#', '**', '##')):
-                if current_text:
-                    sections['common_pitfalls'] = self._parse_list('\n'.join(current_text))
-                current_section = 'suggested_modifications'
-                current_text = []
-
-            else:
-                if line.strip():
-                    current_text.append(line)
-
-        # Process last section
-        if current_text:
-            if current_section == 'line_by_line':
-                sections['line_by_line'] = self._parse_line_by_line('\n'.join(current_text))
-            elif current_section == 'key_concepts':
-                sections['key_concepts'] = self._parse_key_concepts('\n'.join(current_text))
-            elif current_section == 'common_pitfalls':
-                sections['common_pitfalls'] = self._parse_list('\n'.join(current_text))
-            elif current_section == 'suggested_modifications':
-                sections['suggested_modifications'] = self._parse_modifications('\n'.join(current_text))
-            else:
-                sections[current_section] = '\n'.join(current_text).strip()
+        self._store_section(sections, current_section, ai_response[start:])
 
         return sections
 
+    def _store_section(self, sections: Dict[str, Any], section: str, body: str):
+        """Parse a section body with the parser for its section and store it"""
+        lines = [line for line in body.split('\n') if line.strip()]
+        if not lines:
+            return
+
+        text = '\n'.join(lines)
+        if section == 'line_by_line':
+            sections[section] = self._parse_line_by_line(text)
+        elif section == 'key_concepts':
+            sections[section] = self._parse_key_concepts(text)
+        elif section == 'common_pitfalls':
+            sections[section] = self._parse_list(text)
+        elif section == 'suggested_modifications':
+            sections[section] = self._parse_modifications(text)
+        else:
+            sections[section] = text.strip()
+
     def _parse_line_by_line(self, text: str) -> List[Dict[str, Any]]:
         """Parse line-by-line explanations"""
         results = []
@@ -88,7 +82,7 @@ class CodeExplainerAgent(AgentBase):
 
         for line in lines:
             # Look for patterns like "Line 5:" or "5." or "` code ` - explanation"
-            match = re.match(r'(?:Line\s+)?(\d+)[:\.\)]\s*`?([^`\-]+)`?\s*[-:]?\s*(.*)', line, re.IGNORECASE)
+            match = _LINE_REF.match(line)
             if match:
                 results.append({
                     "line_number": int(match.group(1)),
@@ -106,12 +100,12 @@ class CodeExplainerAgent(AgentBase):
         current_concept = None
         for line in lines:
             # Look for concept headers (bold, numbered, or bullet points)
-            if line.strip().startswith(('-', '*', '•')) or re.match(r'^\d+\.', line) or line.strip().startswith('**'):
+            if line.strip().startswith(('-', '*', '•')) or _NUMBERED.match(line) or line.strip().startswith('**'):
                 if current_concept:
                     concepts.append(current_concept)
 
-                concept_name = re.sub(r'^[-*•]\s*', '', line.strip())
-                concept_name = re.sub(r'^\d+\.\s*', '', concept_name)
+                concept_name = _BULLET.sub('', line.strip())
+                concept_name = _NUMBERED.sub('', concept_name)
                 concept_name = concept_name.replace('**', '').strip()
 
                 # Extract concept name before colon if present
@@ -143,9 +137,9 @@ class CodeExplainerAgent(AgentBase):
         items = []
         for line in text.split('\n'):
             line = line.strip()
-            if line.startswith(('-', '*', '•')) or re.match(r'^\d+\.', line):
-                item = re.sub(r'^[-*•]\s*', '', line)
-                item = re.sub(r'^\d+\.\s*', '', item)
+            if line.startswith(('-', '*', '•')) or _NUMBERED.match(line):
+                item = _BULLET.sub('', line)
+                item = _NUMBERED.sub('', item)
                 if item:
                     items.append(item)
 
@@ -174,8 +168,8 @@ class CodeExplainerAgent(AgentBase):
                 if current_mod:
                     mods.append(current_mod)
 
-                desc = re.sub(r'^[-*•]\s*', '', line.strip())
-                desc = re.sub(r'^\d+\.\s*', '', desc)
+                desc = _BULLET.sub('', line.strip())
+                desc = _NUMBERED.sub('', desc)
 
                 current_mod = {
                     "description": desc,
@@ -3,7 +3,64 @@
 from .agent_base import AgentBase
 import json
 import re
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    import json as orjson
+
+# Precompiled patterns for response parsing
+_JSON_TOKENS = re.compile(r'[\[\]"\\]')
+
+# One pass over the fallback text: each line is a question, option, answer or explanation
+_LINE_RX = re.compile(
+    r'^[ \t]*(?:'
+    r'\d+[\.\)][ \t]*(?P<question>.*?)'
+    r'|[A-Da-d][\.\)][ \t]*(?P<option>.*?)'
+    r'|(?i:answer):[ \t]*(?P<answer>.*?)'
+    r'|(?i:explanation):[ \t]*(?P<explanation>.*?)'
+    r')[ \t]*\r?$',
+    re.MULTILINE
+)
+_Q_START = re.compile(r'^[ \t]*\d+[\.\)]', re.MULTILINE)
+
+def _find_json_array(text: str) -> Optional[str]:
+    """Return the first balanced JSON array in text, ignoring brackets inside strings"""
+    start = text.find('[')
+    if start < 0:
+        return None
+
+    depth = 0
+    in_string = False
+    escaped_end = -1
+    # Linear walk over the structural characters only
+    for token in _JSON_TOKENS.finditer(text, start):
+        i = token.start()
+        if i < escaped_end:
+            continue
+        c = token.group()
+        if in_string:
+            if c == '\\':
+                escaped_end = i + 2
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c == '[':
+            depth += 1
+        elif c == ']':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+def _classify_lines(text: str) -> List[Tuple[str, str]]:
+    """Classify fallback lines as (kind, value), starting at the first numbered question"""
+    first = _Q_START.search(text)
+    if not first:
+        return []
+    return [(m.lastgroup, m.group(m.lastgroup)) for m in _LINE_RX.finditer(text, first.start())]
 
 class QuizGeneratorAgent(AgentBase):
     """Agent for generating educational quizzes"""
@@ -24,17 +81,17 @@ class QuizGeneratorAgent(AgentBase):
         # Try to extract JSON from response
         try:
             # Find JSON array in response
-            json_match = re.search(r'\[.*\]', ai_response, re.DOTALL)
-            if json_match:
-                questions = json.loads(json_match.group(0))
+            json_array = _find_json_array(ai_response)
+            if json_array:
+                questions = orjson.loads(json_array.encode())
             else:
                 # Fallback: try parsing entire response
-                questions = json.loads(ai_response)
+                questions = orjson.loads(ai_response)
 
             if not isinstance(questions, list):
                 questions = [questions]
 
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, orjson.JSONDecodeError):
             # Fallback: create a simple structure from text
             questions = self._parse_text_questions(ai_response, inputs)
 
@@ -59,14 +116,11 @@ class QuizGeneratorAgent(AgentBase):
     def _parse_text_questions(self, text: str, inputs: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Fallback parser for non-JSON responses"""
         questions = []
-        lines = text.split('\n')
 
+        # Lines before the first question are skipped, so every item has a current question
         current_q = None
-        for line in lines:
-            line = line.strip()
-
-            # Detect question start (numbered)
-            if re.match(r'^\d+[\.\)]\s*', line):
+        for kind, value in _classify_lines(text):
+            if kind == 'question':
                 if current_q:
                     questions.append(current_q)
 
@@ -74,23 +128,22 @@ class QuizGeneratorAgent(AgentBase):
                     "id": len(questions) + 1,
                     "type": "multiple_choice",
                     "difficulty": inputs.get('difficulty', 'intermediate'),
-                    "question": re.sub(r'^\d+[\.\)]\s*', '', line),
+                    "question": value,
                     "options": [],
                     "correct_answer": "",
                     "explanation": "",
                     "topic": "General"
                 }
 
-            # Detect options (A, B, C, D or a, b, c, d or -, *)
-            elif current_q and re.match(r'^[A-Da-d][\.\)]\s*', line):
-                option = re.sub(r'^[A-Da-d][\.\)]\s*', '', line)
-                current_q['options'].append(option)
+            # Options (A, B, C, D or a, b, c, d)
+            elif kind == 'option':
+                current_q['options'].append(value)
 
-            elif current_q and line.lower().startswith('answer:'):
-                current_q['correct_answer'] = line.split(':', 1)[1].strip()
+            elif kind == 'answer':
+                current_q['correct_answer'] = value
 
-            elif current_q and line.lower().startswith('explanation:'):
-                current_q['explanation'] = line.split(':', 1)[1].strip()
+            elif kind == 'explanation':
+                current_q['explanation'] = value
 
         # Add last question
         if current_q:
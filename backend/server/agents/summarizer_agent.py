@@ -3,7 +3,28 @@
 from .agent_base import AgentBase
 import json
 import re
-from typing import Dict, Any
+from typing import Dict, Any, List
+
+# Precompiled patterns for response parsing
+_BULLET = re.compile(r'^[-*•]\s*')
+_NUMBERED = re.compile(r'^\d+\.\s*')
+
+def _last_sentences(text: str, count: int) -> List[str]:
+    """Return the last count pieces of text split on runs of . ! ? (same as re.split, tail only)"""
+    pieces = []
+    end = len(text)
+    while len(pieces) < count:
+        j = max(text.rfind('.', 0, end), text.rfind('!', 0, end), text.rfind('?', 0, end))
+        if j < 0:
+            pieces.append(text[:end])
+            break
+        pieces.append(text[j + 1:end])
+        # Treat a run like "?!" or "..." as one terminator
+        while j > 0 and text[j - 1] in '.!?':
+            j -= 1
+        end = j
+    pieces.reverse()
+    return pieces
 
 class SummarizerAgent(AgentBase):
     """Agent for summarizing textbook content"""
@@ -20,38 +41,36 @@ class SummarizerAgent(AgentBase):
 
         in_key_points = False
         summary_lines = []
+        word_count = 0
 
         for line in lines:
             stripped = line.strip()
 
-            # Detect key points section
-            if 'key' in stripped.lower() and ('point' in stripped.lower() or 'takeaway' in stripped.lower()):
-                in_key_points = True
-                continue
-
             if in_key_points:
                 # Extract bullet points or numbered items
-                if stripped.startswith(('-', '*', '•')) or re.match(r'^\d+\.', stripped):
+                if stripped.startswith(('-', '*', '•')) or _NUMBERED.match(stripped):
                     # Clean up the bullet/number
-                    point = re.sub(r'^[-*•]\s*', '', stripped)
-                    point = re.sub(r'^\d+\.\s*', '', point)
+                    point = _BULLET.sub('', stripped)
+                    point = _NUMBERED.sub('', point)
                     if point:
                         key_points.append(point)
-            else:
+                continue
+
+            # Detect key points section
+            low = stripped.lower()
+            if 'key' in low and ('point' in low or 'takeaway' in low):
+                in_key_points = True
+            elif stripped and not stripped.startswith('#'):
                 # Part of summary
-                if stripped and not stripped.startswith('#'):
-                    summary_lines.append(stripped)
+                summary_lines.append(stripped)
+                word_count += len(stripped.split())
 
         # Join summary
-        summary = ' '.join(summary_lines).strip()
+        summary = ' '.join(summary_lines)  # Lines are already stripped and non-empty
 
         # If we couldn't parse key points, take last 3-5 sentences
         if not key_points and summary:
-            sentences = re.split(r'[.!?]+', summary)
-            key_points = [s.strip() for s in sentences[-5:] if s.strip()]
-
-        # Calculate word count
-        word_count = len(summary.split())
+            key_points = [s.strip() for s in _last_sentences(summary, 5) if s.strip()]
 
         # Calculate compression ratio
         original_length = len(inputs.get('text', '').split())
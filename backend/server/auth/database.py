@@ -3,10 +3,11 @@ Database models for authentication and user profiles
 Uses Neon Serverless Postgres
 """
 
-from sqlalchemy import create_engine, Column, String, Integer, JSON, DateTime, Boolean, Text
+from sqlalchemy import create_engine, Column, String, Integer, JSON, DateTime, Boolean, Text, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from datetime import datetime
+from sqlalchemy.sql import func
 import os
 from dotenv import load_dotenv
 
@@ -16,11 +17,17 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./physical_ai.db")
 
 # Handle Neon's connection pooling
 if "neon.tech" in DATABASE_URL:
+    # Recycle connections before Neon drops idle ones instead of pinging on every checkout
     engine = create_engine(
         DATABASE_URL,
-        pool_pre_ping=True,
-        pool_size=5,
-        max_overflow=10
+        pool_pre_ping=False,
+        pool_recycle=300,
+        pool_size=10,
+        max_overflow=20,
+        connect_args={
+            "sslmode": "require",
+            "options": "-c statement_timeout=5000"
+        }
     )
 elif "sqlite" in DATABASE_URL:
     # SQLite-specific configuration
@@ -31,22 +38,26 @@ elif "sqlite" in DATABASE_URL:
 else:
     engine = create_engine(DATABASE_URL)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Keep loaded attributes after commit so responses built from them need no reload SELECT
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 Base = declarative_base()
 
 class User(Base):
     """User model with onboarding data"""
     __tablename__ = "users"
+    __table_args__ = (
+        Index('ix_users_onboarding_gin', 'onboarding', postgresql_using='gin'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     is_active = Column(Boolean, default=True)
 
-    # Onboarding data (stored as JSON)
-    onboarding = Column(JSON, default={})
+    # Onboarding data (JSONB on Postgres so it can be GIN-indexed, plain JSON on SQLite)
+    onboarding = Column(JSON().with_variant(JSONB(), 'postgresql'), default=dict, server_default='{}')
     # Structure:
     # {
     #   "role": "Student|Professional|Researcher|Instructor",
@@ -59,25 +70,33 @@ class User(Base):
 class ChatHistory(Base):
     """RAG chatbot conversation history"""
     __tablename__ = "chat_history"
+    __table_args__ = (
+        # Serves "latest N messages for a user" as a bounded index range scan
+        Index('ix_chat_history_user_created', 'user_id', 'created_at'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, index=True)
+    user_id = Column(Integer)
     message = Column(String, nullable=False)
     response = Column(String, nullable=False)
     chapter_id = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
 
 class PersonalizationCache(Base):
     """Cache for personalized chapter content"""
     __tablename__ = "personalization_cache"
+    __table_args__ = (
+        # Cache lookup key (migration 001); its user_id prefix also serves per-user queries
+        UniqueConstraint('user_id', 'chapter_id', 'profile_hash', name='unique_cache_entry'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, index=True, nullable=False)
-    chapter_id = Column(String(50), index=True, nullable=False)
-    profile_hash = Column(String(64), index=True, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    chapter_id = Column(String(50), index=True, nullable=False)  # Chapter-wide invalidation
+    profile_hash = Column(String(64), nullable=False)
     personalized_content = Column(Text, nullable=False)
     applied_transformations = Column(JSON, default=list)  # Changed from ARRAY to JSON for SQLite compatibility
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
     version = Column(Integer, default=1)
 
 class PersonalizationLog(Base):
@@ -91,7 +110,7 @@ class PersonalizationLog(Base):
     response_time_ms = Column(Integer)
     cached = Column(Boolean, default=False)
     llm_provider = Column(String(20))
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
 
 class TranslationCache(Base):
     """Cache for translated chapter content"""
@@ -102,8 +121,8 @@ class TranslationCache(Base):
     language = Column(String(10), index=True, nullable=False)  # 'urdu' for Urdu
     content_hash = Column(String(64), index=True, nullable=False)  # MD5 hash for cache invalidation
     translated_content = Column(Text, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     version = Column(Integer, default=1)
 
 def init_db():
@@ -119,6 +138,10 @@ def get_db():
     finally:
         db.close()
 
+def get_session_factory():
+    """Session factory dependency for work that outlives the request-scoped session"""
+    return SessionLocal
+
 if __name__ == "__main__":
     print(f"Initializing database: {DATABASE_URL[:50]}...")
     init_db()
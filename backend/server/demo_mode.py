@@ -3,18 +3,21 @@ Demo Mode - Mock LLM Responses
 Use this when you don't have API keys for testing
 """
 
-import time
+import asyncio
+import re
 from typing import Dict, Any
 
+from translate.masking import mask, unmask
+
 
 class DemoPersonalizer:
     """Mock personalization without API calls"""
 
-    def personalize(self, content: str, user_profile: Dict[str, Any]) -> tuple[str, Dict[str, Any]]:
+    async def personalize(self, content: str, user_profile: Dict[str, Any]) -> tuple[str, Dict[str, Any]]:
         """Return demo personalized content"""
 
-        # Simulate processing time
-        time.sleep(1)
+        # Simulate processing time without blocking the event loop
+        await asyncio.sleep(1)
 
         role = user_profile.get("role", "Student")
         experience = user_profile.get("programming_experience", "Beginner")
@@ -70,11 +73,23 @@ class DemoTranslator:
             "system": "نظام",
         }
 
-    def translate(self, content: str, target_language: str = "urdu") -> tuple[str, Dict[str, Any]]:
+        # Longest term first so "robotics" wins over "robot"; one case-insensitive pass over the content
+        self._gloss_lookup = {term.lower(): urdu for term, urdu in self.glossary.items()}
+        self._gloss_rx = re.compile(
+            r'\b(' + '|'.join(re.escape(k) for k in sorted(self.glossary, key=len, reverse=True)) + r')\b',
+            re.IGNORECASE
+        )
+
+    async def translate(self, content: str, target_language: str = "urdu") -> tuple[str, Dict[str, Any]]:
         """Return demo translated content"""
 
-        # Simulate processing time
-        time.sleep(1.5)
+        # Simulate processing time without blocking the event loop
+        await asyncio.sleep(1.5)
+
+        # Apply the glossary word-by-word, leaving code, LaTeX and link targets untouched
+        masked, slots = mask(content)
+        masked = self._gloss_rx.sub(lambda m: self._gloss_lookup[m.group(0).lower()], masked)
+        content = unmask(masked, slots)
 
         # For demo, we'll just add Urdu headers and some translated text
         translated = f"""
@@ -123,20 +138,18 @@ class DemoRAG:
             "default": "I'm running in DEMO MODE without API keys. I can only give pre-written answers. To get real AI-powered responses:\n\n1. Get free Claude API key from console.anthropic.com ($5 free)\n2. Add it to server/.env file\n3. Restart the backend\n\nThen I can answer ANY question about robotics with citations from the textbook!"
         }
 
-    def query(self, message: str, chapter_id: str = None) -> Dict[str, Any]:
+        # All keywords in one alternation, so a query is a single scan of the message
+        self._kw_rx = re.compile('(' + '|'.join(re.escape(k) for k in self.responses if k != 'default') + ')')
+
+    async def query(self, message: str, chapter_id: str = None) -> Dict[str, Any]:
         """Return demo chat response"""
 
-        # Simulate processing time
-        time.sleep(0.5)
+        # Simulate processing time without blocking the event loop
+        await asyncio.sleep(0.5)
 
         # Simple keyword matching
-        message_lower = message.lower()
-        response = self.responses["default"]
-
-        for keyword, answer in self.responses.items():
-            if keyword in message_lower:
-                response = answer
-                break
+        match = self._kw_rx.search(message.lower())
+        response = self.responses[match.group(1)] if match else self.responses["default"]
 
         return {
             "answer": response,
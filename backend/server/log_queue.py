@@ -0,0 +1,42 @@
+"""
+Queue-backed Logging
+Log handlers run on a listener thread so request handlers never block on log I/O
+"""
+
+import logging
+import os
+import queue
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+@contextmanager
+def queue_logging():
+    """
+    Route root logger records through an in-memory queue to the root handlers
+    Handlers already configured on the root logger are moved behind the queue; with none,
+    a stderr handler is used. The root level comes from LOG_LEVEL (default INFO).
+    Used around the app lifespan; the listener is stopped and flushed and the root
+    logger restored on exit
+    """
+    root = logging.getLogger()
+    previous_handlers = root.handlers[:]
+    previous_level = root.level
+
+    handlers = previous_handlers
+    if not handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        handlers = [handler]
+
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+
+    root.handlers = [QueueHandler(log_queue)]
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    listener.start()
+    try:
+        yield
+    finally:
+        root.handlers = previous_handlers
+        root.setLevel(previous_level)
+        listener.stop()
@@ -5,34 +5,57 @@ Provides: Auth, Personalization, Translation, RAG, and Agent endpoints
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 import os
+import logging
+import importlib
+import importlib.util
 from dotenv import load_dotenv
+from log_queue import queue_logging
 
 # Load environment variables
 load_dotenv()
 
-# Import routers
-from agents.routes import router as agents_router
-from auth.routes import router as auth_router
-from personalize.routes import router as personalize_router
-from translate.routes import router as translate_router  # STEP E
-from rag.routes import router as rag_router  # STEP F
+logger = logging.getLogger(__name__)
+
+# Routers: (name, module, prefix, tags, endpoint, requires). Modules are imported only when the
+# router is mounted; by default, routers whose optional packages are not installed are skipped
+ROUTERS = [
+    ("agents", "agents.routes", "/api/agent", ["Agents"], "/api/agent/*", ("anthropic", "jinja2")),
+    ("auth", "auth.routes", "/auth", ["Authentication"], "/auth/*", ()),
+    ("personalize", "personalize.routes", "/api", ["Personalization"], "/api/personalize", ()),
+    ("translate", "translate.routes", "/api", ["Translation"], "/api/translate", ("anthropic", "openai")),  # STEP E
+    ("rag", "rag.routes", "/api/rag", ["RAG Chatbot"], "/api/rag/*", ()),  # STEP F
+]
+
+# Comma-separated subset to mount (e.g. "auth,rag"), all of which must load; unset mounts
+# every router that can load
+ENABLED_ROUTERS = os.getenv("ENABLED_ROUTERS")
+
+# Routers actually mounted, name -> public endpoint; filled by include_routers
+LOADED_ROUTERS = {}
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
-    print("Starting Physical AI Textbook API Server...")
-    print(f"Environment: {os.getenv('NODE_ENV', 'development')}")
-    yield
-    print("Shutting down server...")
+    # Log records are written by a background thread, off the event loop
+    with queue_logging():
+        print("Starting Physical AI Textbook API Server...")
+        print(f"Environment: {os.getenv('NODE_ENV', 'development')}")
+        yield
+        print("Shutting down server...")
+        if "translate" in LOADED_ROUTERS:
+            from translate.routes import translator
+            await translator.aclose()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Physical AI Textbook API",
     description="Backend for personalized, multilingual robotics textbook with RAG chatbot",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -60,10 +83,7 @@ async def health_check():
         "endpoints": {
             "health": "/health",
             "docs": "/docs",
-            "auth": "/auth/*",
-            "agents": "/api/agent/*",
-            "personalize": "/api/personalize",
-            "translate": "/api/translate"
+            **LOADED_ROUTERS
         }
     }
 
@@ -77,12 +97,36 @@ async def root():
         "health": "/health"
     }
 
+def include_routers(app: FastAPI):
+    """
+    Import and mount the enabled routers, skipping the import graph of disabled ones
+
+    Raises:
+        ValueError: If ENABLED_ROUTERS names an unknown router
+        ImportError: If a router named in ENABLED_ROUTERS needs a package that is not installed
+    """
+    enabled = {name.strip() for name in ENABLED_ROUTERS.split(",") if name.strip()} if ENABLED_ROUTERS else None
+
+    if enabled is not None:
+        unknown = enabled - {router[0] for router in ROUTERS}
+        if unknown:
+            raise ValueError(f"ENABLED_ROUTERS names unknown routers: {', '.join(sorted(unknown))}")
+
+    for name, module_path, prefix, tags, endpoint, requires in ROUTERS:
+        if enabled is not None and name not in enabled:
+            continue
+        missing = [package for package in requires if importlib.util.find_spec(package) is None]
+        if missing:
+            if enabled is not None:
+                raise ImportError(f"{name} router is enabled but requires {', '.join(missing)}")
+            logger.warning("Skipping %s router: requires %s", name, ", ".join(missing))
+            continue
+        module = importlib.import_module(module_path)
+        app.include_router(module.router, prefix=prefix, tags=tags)
+        LOADED_ROUTERS[name] = endpoint
+
 # Mount routers
-app.include_router(agents_router, prefix="/api/agent", tags=["Agents"])
-app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
-app.include_router(personalize_router, prefix="/api", tags=["Personalization"])
-app.include_router(translate_router, prefix="/api", tags=["Translation"])  # STEP E
-app.include_router(rag_router, prefix="/api/rag", tags=["RAG Chatbot"])  # STEP F
+include_routers(app)
 
 if __name__ == "__main__":
     import uvicorn
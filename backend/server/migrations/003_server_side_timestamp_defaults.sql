@@ -0,0 +1,14 @@
+-- Migration: Move timestamp defaults into the database
+-- Purpose: created_at/updated_at use server_default=now() instead of a Python-side default
+-- Date: 2026-10-15
+
+ALTER TABLE users ALTER COLUMN created_at SET DEFAULT NOW();
+ALTER TABLE users ALTER COLUMN updated_at SET DEFAULT NOW();
+
+ALTER TABLE chat_history ALTER COLUMN created_at SET DEFAULT NOW();
+
+ALTER TABLE personalization_cache ALTER COLUMN created_at SET DEFAULT NOW();
+ALTER TABLE personalization_log ALTER COLUMN created_at SET DEFAULT NOW();
+
+ALTER TABLE translation_cache ALTER COLUMN created_at SET DEFAULT NOW();
+ALTER TABLE translation_cache ALTER COLUMN updated_at SET DEFAULT NOW();
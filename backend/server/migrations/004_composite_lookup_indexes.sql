@@ -0,0 +1,15 @@
+-- Migration: Composite index for chat history, drop indexes superseded by composite keys
+-- Purpose: Serve "latest N messages per user" from a single index; cache lookups use unique_cache_entry
+-- Date: 2026-10-15
+
+CREATE INDEX IF NOT EXISTS ix_chat_history_user_created
+ON chat_history(user_id, created_at);
+
+-- Superseded by the composite index above
+DROP INDEX IF EXISTS ix_chat_history_user_id;
+
+-- Superseded by unique_cache_entry from migration 001 (user_id is its leading column); chapter_id index is kept
+DROP INDEX IF EXISTS ix_personalization_cache_user_id;
+DROP INDEX IF EXISTS ix_personalization_cache_profile_hash;
+DROP INDEX IF EXISTS idx_cache_user;
+DROP INDEX IF EXISTS idx_cache_profile_hash;
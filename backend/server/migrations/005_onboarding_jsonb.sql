@@ -0,0 +1,12 @@
+-- Migration: Store users.onboarding as JSONB
+-- Purpose: Binary JSON storage with a GIN index for filtering on profile fields
+-- Date: 2026-10-15
+
+ALTER TABLE users
+ALTER COLUMN onboarding TYPE JSONB USING onboarding::jsonb;
+
+ALTER TABLE users
+ALTER COLUMN onboarding SET DEFAULT '{}';
+
+CREATE INDEX IF NOT EXISTS ix_users_onboarding_gin
+ON users USING GIN (onboarding);
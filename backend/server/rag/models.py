@@ -2,23 +2,28 @@
 Pydantic models for RAG chatbot
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 
+# Immutable per-request models; unknown fields are dropped rather than stored
+_MODEL_CONFIG = dict(frozen=True, extra='ignore', str_strip_whitespace=True)
+
 class ChatRequest(BaseModel):
     """Chat request model"""
     message: str = Field(..., description="User's question or message")
     chapter_id: Optional[str] = Field(None, description="Specific chapter to query")
     selected_text: Optional[str] = Field(None, description="Selected text for context")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        **_MODEL_CONFIG,
+        json_schema_extra={
             "example": {
                 "message": "What is ROS?",
                 "chapter_id": "chapter-01",
                 "selected_text": None
             }
         }
+    )
 
 class Source(BaseModel):
     """Source document model"""
@@ -27,6 +32,8 @@ class Source(BaseModel):
     chapter: Optional[str] = None
     chunk_id: Optional[int] = None
 
+    model_config = ConfigDict(**_MODEL_CONFIG)
+
 class ChatResponse(BaseModel):
     """Chat response model"""
     answer: str
@@ -34,8 +41,9 @@ class ChatResponse(BaseModel):
     conversation_id: Optional[int] = None
     metadata: Dict[str, Any]
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        **_MODEL_CONFIG,
+        json_schema_extra={
             "example": {
                 "answer": "ROS (Robot Operating System) is a flexible framework...",
                 "sources": [
@@ -54,15 +62,20 @@ class ChatResponse(BaseModel):
                 }
             }
         }
+    )
 
 class EmbedRequest(BaseModel):
     """Request to embed documents"""
     docs_path: str = Field(default="../docs", description="Path to docs directory")
     force_reindex: bool = Field(default=False, description="Force reindexing even if already embedded")
 
+    model_config = ConfigDict(**_MODEL_CONFIG)
+
 class EmbedResponse(BaseModel):
     """Embed response"""
     status: str
     num_documents: int
     num_chunks: int
     processing_time_s: float
+
+    model_config = ConfigDict(**_MODEL_CONFIG)
@@ -3,22 +3,41 @@ RAG Chatbot API Routes
 Integrated with auth, personalization, and translation
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, insert, bindparam
 from sqlalchemy.orm import Session
 import os
+import orjson
 from pathlib import Path
 
-from auth.database import get_db, User, ChatHistory
+from auth.database import get_db, get_session_factory, User, ChatHistory
 from auth.routes import get_current_user
 from .models import ChatRequest, ChatResponse, EmbedRequest, EmbedResponse
 
 router = APIRouter()
 
+# Read-only history listing: plain column rows, no ORM instances
+_HIST_STMT = (
+    select(
+        ChatHistory.id,
+        ChatHistory.message,
+        ChatHistory.response,
+        ChatHistory.chapter_id,
+        ChatHistory.created_at
+    )
+    .where(ChatHistory.user_id == bindparam('uid'))
+    # created_at has one-second resolution on SQLite; id breaks ties in insertion order
+    .order_by(ChatHistory.created_at.desc(), ChatHistory.id.desc())
+    .limit(bindparam('lim'))
+)
+
 # Note: Full RAG implementation requires Qdrant setup
 # This is a stub that integrates with existing auth system
 # For full implementation, see rag/api/main.py
 
-@router.post("/chat", response_model=ChatResponse)
+# Response body is pre-serialized; ChatResponse documents its shape
+@router.post("/chat", responses={200: {"model": ChatResponse}})
 async def chat_with_ai(
     request: ChatRequest,
     current_user: User = Depends(get_current_user),
@@ -40,27 +59,28 @@ async def chat_with_ai(
         # For now, return stub response
         response_text = f"AI response to: {request.message}"
 
-        # Save to chat history
-        chat_entry = ChatHistory(
-            user_id=current_user.id,
-            message=request.message,
-            response=response_text,
-            chapter_id=request.chapter_id
-        )
-        db.add(chat_entry)
+        # Save to chat history; RETURNING gives the id without a refresh round-trip
+        chat_id = db.execute(
+            insert(ChatHistory).values(
+                user_id=current_user.id,
+                message=request.message,
+                response=response_text,
+                chapter_id=request.chapter_id
+            ).returning(ChatHistory.id)
+        ).scalar_one()
         db.commit()
-        db.refresh(chat_entry)
 
-        return ChatResponse(
-            answer=response_text,
-            sources=[],
-            conversation_id=chat_entry.id,
-            metadata={
+        payload = {
+            "answer": response_text,
+            "sources": [],
+            "conversation_id": chat_id,
+            "metadata": {
                 "processing_time_ms": 100,
                 "llm_provider": "stub",
                 "tokens_used": 0
             }
-        )
+        }
+        return Response(orjson.dumps(payload), media_type="application/json")
 
     except Exception as e:
         raise HTTPException(
@@ -68,38 +88,63 @@ async def chat_with_ai(
             detail=f"Chat failed: {str(e)}"
         )
 
+def _stream_history(rows, user_id: int):
+    """Yield the history JSON document row by row"""
+    yield b'{"user_id":%d,"history":[' % user_id
+    first = True
+    for entry in rows:
+        yield (b'' if first else b',') + orjson.dumps({
+            "id": entry["id"],
+            "message": entry["message"],
+            "response": entry["response"],
+            "chapter_id": entry["chapter_id"],
+            "timestamp": entry["created_at"].isoformat()
+        })
+        first = False
+    yield b']}'
+
+class _SessionStreamingResponse(StreamingResponse):
+    """StreamingResponse that closes the session feeding its body however sending ends"""
+
+    def __init__(self, content, db: Session, **kwargs):
+        super().__init__(content, **kwargs)
+        self.db = db
+
+    async def __call__(self, scope, receive, send):
+        # Runs even if the client is gone before the first chunk and the body is never iterated
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.db.close()
+
 @router.get("/chat/history")
 async def get_chat_history(
     limit: int = 20,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    session_factory = Depends(get_session_factory)
 ):
     """Get chat history for authenticated user"""
+    # The request-scoped session is closed before a streamed body is sent, so the body owns this one
+    db = session_factory()
     try:
-        history = db.query(ChatHistory).filter(
-            ChatHistory.user_id == current_user.id
-        ).order_by(ChatHistory.created_at.desc()).limit(limit).all()
-
-        return {
-            "user_id": current_user.id,
-            "history": [
-                {
-                    "id": entry.id,
-                    "message": entry.message,
-                    "response": entry.response,
-                    "chapter_id": entry.chapter_id,
-                    "timestamp": entry.created_at.isoformat()
-                }
-                for entry in history
-            ]
-        }
+        rows = db.execute(
+            _HIST_STMT, {"uid": current_user.id, "lim": limit},
+            execution_options={"yield_per": 100}
+        ).mappings()
 
     except Exception as e:
+        db.close()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve history: {str(e)}"
         )
 
+    return _SessionStreamingResponse(
+        _stream_history(rows, current_user.id),
+        db,
+        media_type="application/json"
+    )
+
 @router.get("/rag/health")
 async def rag_health():
     """Health check for RAG module"""
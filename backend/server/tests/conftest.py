@@ -2,15 +2,24 @@
 Shared Test Fixtures and Configuration
 """
 
+import os
+
+# Cheapest legal bcrypt work factor for tests; must be set before auth.security is imported
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
 import pytest
+import yaml
+from pathlib import Path
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from auth.database import Base, get_db
+from auth.database import Base, get_db, get_session_factory
 from main import app
 
 # Test database configuration
-SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///./test.db"
+# One SQLite file per pytest-xdist worker so parallel workers never share a database
+_XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+SQLALCHEMY_TEST_DATABASE_URL = f"sqlite:///./test_{_XDIST_WORKER}.db" if _XDIST_WORKER else "sqlite:///./test.db"
 engine = create_engine(
     SQLALCHEMY_TEST_DATABASE_URL,
     connect_args={"check_same_thread": False}
@@ -28,14 +37,28 @@ def override_get_db():
         db.close()
 
 
-# Apply dependency override
+# Apply dependency overrides
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
 
 
 @pytest.fixture(scope="session")
-def test_client():
-    """Create a test client for the application"""
-    return TestClient(app)
+def client():
+    """One test client for the whole session; lifespan startup and shutdown run once"""
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def test_client(client):
+    """Alias of the shared session client"""
+    return client
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    """The test database engine, for modules that manage their own schema lifetime"""
+    return engine
 
 
 @pytest.fixture(scope="function", autouse=True)
@@ -46,6 +69,17 @@ def setup_database():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(scope="session")
+def specs():
+    """All agent spec YAMLs, parsed once per test session"""
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    root = Path(__file__).resolve().parents[2] / "spec" / "agents"
+    return {
+        name: yaml.load((root / f"{name}.yaml").read_text(), Loader=loader)
+        for name in ("summarizer", "quiz-generator", "code-explainer")
+    }
+
+
 @pytest.fixture
 def test_user_data():
     """Standard test user data"""
@@ -69,9 +103,10 @@ def authenticated_client(test_client, test_user_data):
     response = test_client.post("/auth/signup", json=test_user_data)
     token = response.json()["access_token"]
 
-    # Add auth header to client
-    test_client.headers = {"Authorization": f"Bearer {token}"}
-    return test_client
+    # Add auth header to the shared client for this test only
+    test_client.headers["Authorization"] = f"Bearer {token}"
+    yield test_client
+    test_client.headers.pop("Authorization", None)
 
 
 @pytest.fixture
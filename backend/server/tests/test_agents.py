@@ -4,10 +4,10 @@ Tests spec validation, agent execution, and API endpoints
 """
 
 import pytest
-import yaml
 from pathlib import Path
 import sys
 import os
+from hypothesis import given, strategies as st
 
 # Add server to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -17,56 +17,25 @@ from agents.summarizer_agent import SummarizerAgent
 from agents.quiz_generator_agent import QuizGeneratorAgent
 from agents.code_explainer_agent import CodeExplainerAgent
 
+@pytest.mark.xdist_group(name="specs")
 class TestAgentSpecs:
     """Test agent YAML specifications"""
 
-    def test_summarizer_spec_exists(self):
-        """Test that summarizer spec file exists and is valid YAML"""
-        spec_path = Path(__file__).parent.parent.parent / "spec" / "agents" / "summarizer.yaml"
-        assert spec_path.exists(), "summarizer.yaml not found"
+    @pytest.mark.parametrize("agent_name", ["summarizer", "quiz-generator", "code-explainer"])
+    def test_spec_exists(self, specs, agent_name):
+        """Test that each agent spec file exists and is valid YAML"""
+        spec = specs[agent_name]
 
-        with open(spec_path) as f:
-            spec = yaml.safe_load(f)
-
-        assert spec['name'] == 'summarizer'
+        assert spec['name'] == agent_name
         assert 'inputs' in spec
         assert 'outputs' in spec
         assert 'prompt_template' in spec
 
-    def test_quiz_generator_spec_exists(self):
-        """Test that quiz-generator spec file exists and is valid YAML"""
-        spec_path = Path(__file__).parent.parent.parent / "spec" / "agents" / "quiz-generator.yaml"
-        assert spec_path.exists(), "quiz-generator.yaml not found"
-
-        with open(spec_path) as f:
-            spec = yaml.safe_load(f)
-
-        assert spec['name'] == 'quiz-generator'
-        assert 'inputs' in spec
-        assert 'outputs' in spec
-
-    def test_code_explainer_spec_exists(self):
-        """Test that code-explainer spec file exists and is valid YAML"""
-        spec_path = Path(__file__).parent.parent.parent / "spec" / "agents" / "code-explainer.yaml"
-        assert spec_path.exists(), "code-explainer.yaml not found"
-
-        with open(spec_path) as f:
-            spec = yaml.safe_load(f)
-
-        assert spec['name'] == 'code-explainer'
-        assert 'inputs' in spec
-        assert 'outputs' in spec
-
-    def test_spec_schema_validation(self):
+    def test_spec_schema_validation(self, specs):
         """Test that all specs follow required schema"""
         required_fields = ['name', 'version', 'description', 'inputs', 'outputs', 'prompt_template']
 
-        for agent_name in ['summarizer', 'quiz-generator', 'code-explainer']:
-            spec_path = Path(__file__).parent.parent.parent / "spec" / "agents" / f"{agent_name}.yaml"
-
-            with open(spec_path) as f:
-                spec = yaml.safe_load(f)
-
+        for agent_name, spec in specs.items():
             for field in required_fields:
                 assert field in spec, f"{agent_name} missing required field: {field}"
 
@@ -76,57 +45,69 @@ class TestAgentSpecs:
                 assert 'description' in input_spec, f"{agent_name}.{input_name} missing description"
 
 
+@pytest.fixture(scope="module", autouse=True)
+def _fake_api_key():
+    """Mock API key for the module; restored afterwards so it does not leak into other test files"""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('OPENAI_API_KEY', 'test-key')
+        yield
+
+@pytest.fixture(scope="module")
+def summarizer_agent(_fake_api_key):
+    """One summarizer for the module; validate/render/parse never mutate the agent"""
+    return SummarizerAgent()
+
+@pytest.fixture(scope="module")
+def quiz_agent(_fake_api_key):
+    """One quiz generator for the module"""
+    return QuizGeneratorAgent()
+
+@pytest.fixture(scope="module")
+def code_agent(_fake_api_key):
+    """One code explainer for the module"""
+    return CodeExplainerAgent()
+
+
+@pytest.mark.xdist_group(name="validation")
 class TestAgentValidation:
     """Test agent input validation"""
 
-    def test_summarizer_required_fields(self):
+    def test_summarizer_required_fields(self, summarizer_agent):
         """Test summarizer validates required fields"""
-        # Mock API key to avoid needing real one
-        os.environ['OPENAI_API_KEY'] = 'test-key'
-
-        agent = SummarizerAgent()
-
         # Missing required 'text' field
         with pytest.raises(ValueError, match="Required field missing: text"):
-            agent.validate_input({})
+            summarizer_agent.validate_input({})
 
-    def test_summarizer_enum_validation(self):
+    def test_summarizer_enum_validation(self, summarizer_agent):
         """Test summarizer validates enum values"""
-        os.environ['OPENAI_API_KEY'] = 'test-key'
-        agent = SummarizerAgent()
-
         # Invalid summary_type
         with pytest.raises(ValueError, match="must be one of"):
-            agent.validate_input({
+            summarizer_agent.validate_input({
                 "text": "Test text",
                 "summary_type": "invalid_type"
             })
 
-    def test_quiz_generator_range_validation(self):
-        """Test quiz generator validates integer ranges"""
-        os.environ['OPENAI_API_KEY'] = 'test-key'
-        agent = QuizGeneratorAgent()
-
-        # Question count below minimum
+    @given(question_count=st.integers(max_value=0))
+    def test_quiz_generator_rejects_too_few_questions(self, quiz_agent, question_count):
+        """Test quiz generator rejects question counts below 1"""
         with pytest.raises(ValueError, match="below minimum"):
-            agent.validate_input({
+            quiz_agent.validate_input({
                 "content": "Test content",
-                "question_count": 0
+                "question_count": question_count
             })
 
-        # Question count above maximum
+    @given(question_count=st.integers(min_value=21))
+    def test_quiz_generator_rejects_too_many_questions(self, quiz_agent, question_count):
+        """Test quiz generator rejects question counts above 20"""
         with pytest.raises(ValueError, match="above maximum"):
-            agent.validate_input({
+            quiz_agent.validate_input({
                 "content": "Test content",
-                "question_count": 25
+                "question_count": question_count
             })
 
-    def test_code_explainer_default_values(self):
+    def test_code_explainer_default_values(self, code_agent):
         """Test code explainer applies default values"""
-        os.environ['OPENAI_API_KEY'] = 'test-key'
-        agent = CodeExplainerAgent()
-
-        validated = agent.validate_input({
+        validated = code_agent.validate_input({
             "code": "print('hello')"
         })
 
@@ -134,30 +115,25 @@ class TestAgentValidation:
         assert validated['explanation_level'] == 'intermediate'  # default
 
 
+@pytest.mark.xdist_group(name="rendering")
 class TestAgentPromptRendering:
     """Test prompt template rendering"""
 
-    def test_summarizer_prompt_rendering(self):
+    def test_summarizer_prompt_rendering(self, summarizer_agent):
         """Test summarizer renders prompt correctly"""
-        os.environ['OPENAI_API_KEY'] = 'test-key'
-        agent = SummarizerAgent()
-
         inputs = {
             "text": "Test chapter content about ROS",
             "summary_type": "balanced"
         }
 
-        prompt = agent.render_prompt(inputs)
+        prompt = summarizer_agent.render_prompt(inputs)
 
         assert "Test chapter content about ROS" in prompt
         assert "balanced" in prompt
         assert "{{text}}" not in prompt  # Template variables should be replaced
 
-    def test_quiz_generator_prompt_rendering(self):
+    def test_quiz_generator_prompt_rendering(self, quiz_agent):
         """Test quiz generator renders prompt with array"""
-        os.environ['OPENAI_API_KEY'] = 'test-key'
-        agent = QuizGeneratorAgent()
-
         inputs = {
             "content": "Test content",
             "question_count": 5,
@@ -165,21 +141,19 @@ class TestAgentPromptRendering:
             "question_types": ["multiple_choice", "true_false"]
         }
 
-        prompt = agent.render_prompt(inputs)
+        prompt = quiz_agent.render_prompt(inputs)
 
         assert "5" in prompt
         assert "intermediate" in prompt
         assert "multiple_choice" in prompt or "true_false" in prompt
 
 
+@pytest.mark.xdist_group(name="parsing")
 class TestAgentParsing:
     """Test response parsing"""
 
-    def test_summarizer_parsing(self):
+    def test_summarizer_parsing(self, summarizer_agent):
         """Test summarizer parses AI response correctly"""
-        os.environ['OPENAI_API_KEY'] = 'test-key'
-        agent = SummarizerAgent()
-
         ai_response = """
         This is a comprehensive summary of the chapter covering ROS fundamentals.
         The chapter introduces key concepts for robotics programming.
@@ -191,7 +165,7 @@ class TestAgentParsing:
         """
 
         inputs = {"text": "Original text here " * 100}
-        result = agent.parse_response(ai_response, inputs)
+        result = summarizer_agent.parse_response(ai_response, inputs)
 
         assert 'summary' in result
         assert 'key_points' in result
@@ -199,11 +173,8 @@ class TestAgentParsing:
         assert len(result['key_points']) > 0
         assert result['word_count'] > 0
 
-    def test_code_explainer_section_parsing(self):
+    def test_code_explainer_section_parsing(self, code_agent):
         """Test code explainer parses sections correctly"""
-        os.environ['OPENAI_API_KEY'] = 'test-key'
-        agent = CodeExplainerAgent()
-
         ai_response = """
         ## Overview
         This code creates a ROS publisher for velocity commands.
@@ -221,7 +192,7 @@ class TestAgentParsing:
         - Not checking rospy.is_shutdown()
         """
 
-        result = agent.parse_response(ai_response, {})
+        result = code_agent.parse_response(ai_response, {})
 
         assert 'overview' in result
         assert 'line_by_line' in result
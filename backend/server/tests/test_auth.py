@@ -2,16 +2,21 @@
 Tests for Authentication Module
 """
 
+import orjson
 import pytest
-from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from auth.database import Base, get_db
 from main import app
 
-# Test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# Test database: in-memory SQLite on one shared connection, so the schema lives in RAM
+SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool
+)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Override dependency
@@ -22,37 +27,111 @@ def override_get_db():
     finally:
         db.close()
 
-app.dependency_overrides[get_db] = override_get_db
 
-# Create test client
-client = TestClient(app)
 
-@pytest.fixture(autouse=True)
+@pytest.fixture(scope="module", autouse=True)
+def use_memory_database():
+    """Route get_db to the in-memory database for this module only"""
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    yield
+    app.dependency_overrides[get_db] = previous
+
+
+@pytest.fixture(scope="session", autouse=True)
 def setup_database():
-    """Create tables before each test and drop after"""
+    """Create tables once per test session and drop them at the end"""
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
 
+# Request bodies serialized once; tests post the bytes directly
+_JSON_HEADERS = {"content-type": "application/json"}
+_SIGNUP_BODY = orjson.dumps({
+    "email": "test@example.com",
+    "password": "SecurePass123!",
+    "onboarding": {
+        "role": "Student",
+        "programming_experience": "Beginner",
+        "robotics_experience": "None",
+        "preferred_language": "English",
+        "hardware_availability": "None"
+    }
+})
+_DUPLICATE_BODY = orjson.dumps({
+    "email": "duplicate@example.com",
+    "password": "Pass123!",
+    "onboarding": {"role": "Student"}
+})
+_DUPLICATE_RETRY_BODY = orjson.dumps({
+    "email": "duplicate@example.com",
+    "password": "Pass456!",
+    "onboarding": {"role": "Student"}
+})
+_INVALID_EMAIL_BODY = orjson.dumps({
+    "email": "not-an-email",
+    "password": "Pass123!",
+    "onboarding": {"role": "Student"}
+})
+_WEAK_PASSWORD_BODY = orjson.dumps({
+    "email": "test@example.com",
+    "password": "123",
+    "onboarding": {"role": "Student"}
+})
+_NONEXISTENT_LOGIN_BODY = orjson.dumps({
+    "email": "nonexistent@example.com",
+    "password": "Pass123!"
+})
+
+SHARED_EMAIL = "shared@example.com"
+SHARED_PASSWORD = "SecurePass123!"
+
+@pytest.fixture(autouse=True)
+def clean_tables():
+    """Empty every table after each test instead of re-running the DDL, keeping the shared user"""
+    yield
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            if table.name == "users":
+                conn.execute(table.delete().where(table.c.email != SHARED_EMAIL))
+            else:
+                conn.execute(table.delete())
+
+@pytest.fixture(scope="module")
+def shared_user(client, setup_database):
+    """Sign up one user for the module so the password hash is computed once"""
+    response = client.post(
+        "/auth/signup",
+        content=orjson.dumps({
+            "email": SHARED_EMAIL,
+            "password": SHARED_PASSWORD,
+            "onboarding": {
+                "role": "Researcher",
+                "programming_experience": "Advanced",
+                "robotics_experience": "Hardware",
+                "preferred_language": "English",
+                "hardware_availability": "Jetson Kit"
+            }
+        }),
+        headers=_JSON_HEADERS
+    )
+    assert response.status_code == 201, response.text
+    return {
+        "email": SHARED_EMAIL,
+        "password": SHARED_PASSWORD,
+        "token": response.json()["access_token"]
+    }
+
 
 class TestAuthSignup:
     """Test user signup functionality"""
 
-    def test_signup_success(self):
+    def test_signup_success(self, client):
         """Test successful user registration"""
         response = client.post(
             "/auth/signup",
-            json={
-                "email": "test@example.com",
-                "password": "SecurePass123!",
-                "onboarding": {
-                    "role": "Student",
-                    "programming_experience": "Beginner",
-                    "robotics_experience": "None",
-                    "preferred_language": "English",
-                    "hardware_availability": "None"
-                }
-            }
+            content=_SIGNUP_BODY,
+            headers=_JSON_HEADERS
         )
 
         assert response.status_code == 200
@@ -62,53 +141,41 @@ class TestAuthSignup:
         assert "user" in data
         assert data["user"]["email"] == "test@example.com"
 
-    def test_signup_duplicate_email(self):
+    def test_signup_duplicate_email(self, client):
         """Test signup with existing email fails"""
         # Create first user
         client.post(
             "/auth/signup",
-            json={
-                "email": "duplicate@example.com",
-                "password": "Pass123!",
-                "onboarding": {"role": "Student"}
-            }
+            content=_DUPLICATE_BODY,
+            headers=_JSON_HEADERS
         )
 
         # Try to create duplicate
         response = client.post(
             "/auth/signup",
-            json={
-                "email": "duplicate@example.com",
-                "password": "Pass456!",
-                "onboarding": {"role": "Student"}
-            }
+            content=_DUPLICATE_RETRY_BODY,
+            headers=_JSON_HEADERS
         )
 
         assert response.status_code == 400
         assert "already registered" in response.json()["detail"].lower()
 
-    def test_signup_invalid_email(self):
+    def test_signup_invalid_email(self, client):
         """Test signup with invalid email format"""
         response = client.post(
             "/auth/signup",
-            json={
-                "email": "not-an-email",
-                "password": "Pass123!",
-                "onboarding": {"role": "Student"}
-            }
+            content=_INVALID_EMAIL_BODY,
+            headers=_JSON_HEADERS
         )
 
         assert response.status_code == 422  # Validation error
 
-    def test_signup_weak_password(self):
+    def test_signup_weak_password(self, client):
         """Test signup with weak password"""
         response = client.post(
             "/auth/signup",
-            json={
-                "email": "test@example.com",
-                "password": "123",
-                "onboarding": {"role": "Student"}
-            }
+            content=_WEAK_PASSWORD_BODY,
+            headers=_JSON_HEADERS
         )
 
         assert response.status_code == 400
@@ -117,25 +184,15 @@ class TestAuthSignup:
 class TestAuthLogin:
     """Test user login functionality"""
 
-    def test_login_success(self):
+    def test_login_success(self, client, shared_user):
         """Test successful login"""
-        # Create user
-        client.post(
-            "/auth/signup",
-            json={
-                "email": "login@example.com",
-                "password": "SecurePass123!",
-                "onboarding": {"role": "Student"}
-            }
-        )
-
-        # Login
         response = client.post(
             "/auth/login",
-            json={
-                "email": "login@example.com",
-                "password": "SecurePass123!"
-            }
+            content=orjson.dumps({
+                "email": shared_user["email"],
+                "password": shared_user["password"]
+            }),
+            headers=_JSON_HEADERS
         )
 
         assert response.status_code == 200
@@ -143,38 +200,26 @@ class TestAuthLogin:
         assert "access_token" in data
         assert data["token_type"] == "bearer"
 
-    def test_login_wrong_password(self):
+    def test_login_wrong_password(self, client, shared_user):
         """Test login with incorrect password"""
-        # Create user
-        client.post(
-            "/auth/signup",
-            json={
-                "email": "user@example.com",
-                "password": "CorrectPass123!",
-                "onboarding": {"role": "Student"}
-            }
-        )
-
-        # Try wrong password
         response = client.post(
             "/auth/login",
-            json={
-                "email": "user@example.com",
+            content=orjson.dumps({
+                "email": shared_user["email"],
                 "password": "WrongPass123!"
-            }
+            }),
+            headers=_JSON_HEADERS
         )
 
         assert response.status_code == 401
         assert "incorrect" in response.json()["detail"].lower()
 
-    def test_login_nonexistent_user(self):
+    def test_login_nonexistent_user(self, client):
         """Test login with non-existent email"""
         response = client.post(
             "/auth/login",
-            json={
-                "email": "nonexistent@example.com",
-                "password": "Pass123!"
-            }
+            content=_NONEXISTENT_LOGIN_BODY,
+            headers=_JSON_HEADERS
         )
 
         assert response.status_code == 401
@@ -183,40 +228,25 @@ class TestAuthLogin:
 class TestAuthProfile:
     """Test user profile endpoints"""
 
-    def test_get_profile_authenticated(self):
+    def test_get_profile_authenticated(self, client, shared_user):
         """Test getting profile with valid token"""
-        # Signup
-        signup_response = client.post(
-            "/auth/signup",
-            json={
-                "email": "profile@example.com",
-                "password": "Pass123!",
-                "onboarding": {
-                    "role": "Researcher",
-                    "programming_experience": "Advanced"
-                }
-            }
-        )
-        token = signup_response.json()["access_token"]
-
-        # Get profile
         response = client.get(
             "/auth/profile",
-            headers={"Authorization": f"Bearer {token}"}
+            headers={"Authorization": f"Bearer {shared_user['token']}"}
         )
 
         assert response.status_code == 200
         data = response.json()
-        assert data["email"] == "profile@example.com"
+        assert data["email"] == shared_user["email"]
         assert data["onboarding"]["role"] == "Researcher"
 
-    def test_get_profile_unauthenticated(self):
+    def test_get_profile_unauthenticated(self, client):
         """Test getting profile without token fails"""
         response = client.get("/auth/profile")
 
         assert response.status_code == 401
 
-    def test_get_profile_invalid_token(self):
+    def test_get_profile_invalid_token(self, client):
         """Test getting profile with invalid token"""
         response = client.get(
             "/auth/profile",
@@ -229,7 +259,7 @@ class TestAuthProfile:
 class TestAuthHealth:
     """Test health check endpoint"""
 
-    def test_health_check(self):
+    def test_health_check(self, client):
         """Test auth health endpoint"""
         response = client.get("/auth/health")
 
@@ -3,35 +3,42 @@ Tests for RAG Chatbot Module
 """
 
 import pytest
-from fastapi.testclient import TestClient
-from unittest.mock import patch, Mock
-from main import app
+from auth.database import Base
 
-client = TestClient(app)
 
+@pytest.fixture(scope="module", autouse=True)
+def setup_database(db_engine):
+    """Keep one schema for the whole module so the shared user survives between tests"""
+    Base.metadata.create_all(bind=db_engine)
+    yield
+    Base.metadata.drop_all(bind=db_engine)
 
-@pytest.fixture
-def auth_token():
-    """Create a test user and return auth token"""
+
+@pytest.fixture(scope="module")
+def auth_token(client, setup_database):
+    """Sign up one user for the module and return its auth token"""
     response = client.post(
         "/auth/signup",
         json={
-            "email": "rag_test@example.com",
+            "email": "rag_shared@example.com",
             "password": "TestPass123!",
             "onboarding": {
                 "role": "Student",
                 "programming_experience": "Beginner",
-                "preferred_language": "English"
+                "robotics_experience": "None",
+                "preferred_language": "English",
+                "hardware_availability": "None"
             }
         }
     )
+    assert response.status_code == 201, response.text
     return response.json()["access_token"]
 
 
 class TestRAGChatEndpoint:
     """Test RAG chatbot API endpoint"""
 
-    def test_chat_unauthenticated(self):
+    def test_chat_unauthenticated(self, client):
         """Test chat without authentication fails"""
         response = client.post(
             "/api/rag/chat",
@@ -43,7 +50,7 @@ class TestRAGChatEndpoint:
 
         assert response.status_code == 401
 
-    def test_chat_missing_message(self, auth_token):
+    def test_chat_missing_message(self, client, auth_token):
         """Test chat without message fails"""
         response = client.post(
             "/api/rag/chat",
@@ -53,26 +60,8 @@ class TestRAGChatEndpoint:
 
         assert response.status_code == 422  # Validation error
 
-    @patch('rag.engine.RAGEngine.query')
-    def test_chat_success(self, mock_query, auth_token):
+    def test_chat_success(self, client, auth_token):
         """Test successful chat interaction"""
-        # Mock RAG query response
-        mock_query.return_value = {
-            "answer": "ROS is a flexible framework for robot software.",
-            "sources": [
-                {
-                    "chapter_id": "chapter-01",
-                    "section": "Introduction",
-                    "relevance_score": 0.95
-                }
-            ],
-            "metadata": {
-                "query_time_ms": 250,
-                "chunks_searched": 10,
-                "model_used": "claude-3-sonnet"
-            }
-        }
-
         response = client.post(
             "/api/rag/chat",
             headers={"Authorization": f"Bearer {auth_token}"},
@@ -85,7 +74,7 @@ class TestRAGChatEndpoint:
         # Note: This may return 200 or 500 depending on RAG implementation status
         assert response.status_code in [200, 500, 501]
 
-    def test_chat_with_selected_text(self, auth_token):
+    def test_chat_with_selected_text(self, client, auth_token):
         """Test chat with selected text context"""
         response = client.post(
             "/api/rag/chat",
@@ -100,7 +89,7 @@ class TestRAGChatEndpoint:
         # Implementation may be incomplete
         assert response.status_code in [200, 500, 501]
 
-    def test_chat_empty_message(self, auth_token):
+    def test_chat_empty_message(self, client, auth_token):
         """Test chat with empty message"""
         response = client.post(
             "/api/rag/chat",
@@ -117,7 +106,7 @@ class TestRAGChatEndpoint:
 class TestRAGChatHistory:
     """Test RAG chat history endpoint"""
 
-    def test_history_authenticated(self, auth_token):
+    def test_history_authenticated(self, client, auth_token):
         """Test getting chat history with authentication"""
         response = client.get(
             "/api/rag/chat/history",
@@ -128,15 +117,36 @@ class TestRAGChatHistory:
         assert response.status_code in [200, 501]
         if response.status_code == 200:
             data = response.json()
-            assert isinstance(data, list)
-
-    def test_history_unauthenticated(self):
+            assert isinstance(data["user_id"], int)
+            assert isinstance(data["history"], list)
+
+    def test_history_returns_latest_chats_first(self, client, auth_token):
+        """Test chats posted to /chat are streamed back newest first, up to limit"""
+        headers = {"Authorization": f"Bearer {auth_token}"}
+        messages = ["What is ROS?", "What is URDF?", "What is Gazebo?"]
+        for message in messages:
+            response = client.post(
+                "/api/rag/chat",
+                headers=headers,
+                json={"message": message, "chapter_id": "chapter-01"}
+            )
+            assert response.status_code == 200
+
+        response = client.get("/api/rag/chat/history?limit=2", headers=headers)
+
+        assert response.status_code == 200
+        history = response.json()["history"]
+        assert [entry["message"] for entry in history] == messages[:0:-1]
+        assert all(entry["chapter_id"] == "chapter-01" for entry in history)
+        assert all(entry["response"] and entry["timestamp"] for entry in history)
+
+    def test_history_unauthenticated(self, client):
         """Test chat history without authentication"""
         response = client.get("/api/rag/chat/history")
 
         assert response.status_code == 401
 
-    def test_history_pagination(self, auth_token):
+    def test_history_pagination(self, client, auth_token):
         """Test chat history with pagination"""
         response = client.get(
             "/api/rag/chat/history?limit=10&offset=0",
@@ -149,7 +159,7 @@ class TestRAGChatHistory:
 class TestRAGHealth:
     """Test RAG health endpoint"""
 
-    def test_health_check(self):
+    def test_health_check(self, client):
         """Test RAG health endpoint"""
         response = client.get("/api/rag/health")
 
@@ -163,23 +173,8 @@ class TestRAGHealth:
 class TestRAGVectorSearch:
     """Test vector search functionality"""
 
-    @patch('rag.vectorstore.QdrantVectorStore.search')
-    def test_vector_search(self, mock_search, auth_token):
+    def test_vector_search(self, client, auth_token):
         """Test vector similarity search"""
-        # Mock vector search results
-        mock_search.return_value = [
-            {
-                "id": "chunk-1",
-                "score": 0.92,
-                "metadata": {"chapter_id": "chapter-01", "section": "Introduction"}
-            },
-            {
-                "id": "chunk-2",
-                "score": 0.88,
-                "metadata": {"chapter_id": "chapter-01", "section": "Setup"}
-            }
-        ]
-
         response = client.post(
             "/api/rag/search",
             headers={"Authorization": f"Bearer {auth_token}"},
@@ -192,7 +187,7 @@ class TestRAGVectorSearch:
         # Implementation may be incomplete
         assert response.status_code in [200, 404, 501]
 
-    def test_vector_search_unauthenticated(self):
+    def test_vector_search_unauthenticated(self, client):
         """Test vector search without authentication"""
         response = client.post(
             "/api/rag/search",
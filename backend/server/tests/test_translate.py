@@ -133,3 +133,370 @@ class TestGlossary:
         assert "ROS" in translator.glossary_terms
         assert "Python" in translator.glossary_terms
         assert "URDF" in translator.glossary_terms
+
+
+async def _pieces(*pieces):
+    """Async iterator over fixed stream pieces"""
+    for piece in pieces:
+        yield piece
+
+
+async def _collect(stream):
+    return [piece async for piece in stream]
+
+
+class TestMasking:
+    """Test placeholder masking of spans the LLM must not touch"""
+
+    def test_round_trip(self):
+        """Test unmask restores every masked span"""
+        from translate.masking import mask, unmask
+
+        text = (
+            "Intro with $x^2$ and a [link](./chapter-02).\n\n"
+            "```python\nprint('hi')\n```\n\n$$\\int f$$\n"
+        )
+        masked, slots = mask(text)
+
+        assert "print" not in masked
+        assert "./chapter-02" not in masked
+        assert "x^2" not in masked
+        assert "[link]" in masked
+        assert unmask(masked, slots) == text
+
+    def test_dollar_amounts_are_prose(self):
+        """Test currency amounts are not mistaken for inline LaTeX"""
+        from translate.masking import mask, unmask
+
+        text = "A servo costs $5 or $10 depending on torque."
+        masked, slots = mask(text)
+
+        assert masked == text
+        assert slots == []
+        assert unmask(masked, slots) == text
+
+    def test_link_target_with_parentheses(self):
+        """Test a link target containing parentheses is masked whole"""
+        from translate.masking import mask, unmask
+
+        text = "See [PID](https://en.wikipedia.org/wiki/PID_(control)) for details."
+        masked, slots = mask(text)
+
+        assert slots == ["(https://en.wikipedia.org/wiki/PID_(control))"]
+        assert masked == "See [PID]§K0§ for details."
+        assert unmask(masked, slots) == text
+
+    def test_literal_section_sign(self):
+        """Test a literal § in the source is masked and restored"""
+        from translate.masking import mask, unmask
+
+        text = "As required by § 3, see $a$."
+        masked, slots = mask(text)
+
+        assert masked.count("§") == 2 * len(slots)
+        assert unmask(masked, slots) == text
+
+    @pytest.mark.asyncio
+    async def test_stream_placeholder_split_across_pieces(self):
+        """Test a placeholder split between stream pieces is restored"""
+        from translate.masking import unmask_stream
+
+        pieces = _pieces("before §", "K", "0", "§ after")
+        out = await _collect(unmask_stream(pieces, ["$x$"]))
+
+        assert "".join(out) == "before $x$ after"
+        assert all("§" not in piece for piece in out)
+
+    @pytest.mark.asyncio
+    async def test_stream_literal_section_sign(self):
+        """Test a stray § in the output cannot hold back a later placeholder"""
+        from translate.masking import mask, unmask_stream
+
+        masked, slots = mask("§ 3 and $x$")
+        cut = masked.index("K1") + 1
+        pieces = _pieces("stray § ", masked[:cut], masked[cut:])
+        out = await _collect(unmask_stream(pieces, slots))
+
+        assert "".join(out) == "stray § § 3 and $x$"
+
+
+class TestSplitMarkdown:
+    """Test chunking of long chapters on level-2 headings"""
+
+    def test_chunks_concatenate_to_input(self):
+        """Test no content is lost or reordered"""
+        from translate.translator import split_markdown
+
+        text = "# Title\n\nIntro\n\n" + "".join(f"## Section {i}\n\nBody {i}\n\n" for i in range(10))
+        chunks = split_markdown(text, max_chars=40)
+
+        assert len(chunks) > 1
+        assert "".join(chunks) == text
+
+    def test_heading_inside_fence_is_not_a_boundary(self):
+        """Test a "## " line inside a code fence does not start a chunk"""
+        from translate.translator import split_markdown
+
+        text = "## Setup\n\n```bash\n## not a heading\necho hi\n```\n\n## Usage\n\nRun it\n"
+        chunks = split_markdown(text, max_chars=1)
+
+        assert chunks == [
+            "## Setup\n\n```bash\n## not a heading\necho hi\n```\n\n",
+            "## Usage\n\nRun it\n"
+        ]
+
+    def test_sections_packed_up_to_max_chars(self):
+        """Test adjacent sections share a chunk while they fit"""
+        from translate.translator import split_markdown
+
+        section = "## S\n\n" + "x" * 14 + "\n"  # 21 characters
+        chunks = split_markdown(section * 5, max_chars=50)
+
+        assert chunks == [section * 2, section * 2, section]
+
+
+class TestTranslateCoalescing:
+    """Test concurrent identical cache misses share one LLM call"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_translate_once(self):
+        """Test two concurrent misses for the same content call the translator once"""
+        import asyncio
+        from unittest.mock import Mock
+        from translate import routes
+
+        async def slow_translate(content, target_language):
+            await asyncio.sleep(0.05)
+            return "ترجمہ", 10
+
+        cache_manager = Mock()
+        with patch.object(routes.translator, "translate", side_effect=slow_translate) as translate, \
+                patch.object(routes.translator, "validate_translation", return_value=True):
+            results = await asyncio.gather(*(
+                routes.translate_and_cache(cache_manager, "chapter-01", "urdu", "hash", "source")
+                for _ in range(2)
+            ))
+
+        assert translate.call_count == 1
+        assert results == [("ترجمہ", 10), ("ترجمہ", 10)]
+        cache_manager.save_translation.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_waiter_takes_over_when_leader_cancelled(self):
+        """Test a waiter translates itself instead of failing when the leader is cancelled"""
+        import asyncio
+        from unittest.mock import Mock
+        from translate import routes
+
+        async def slow_translate(content, target_language):
+            await asyncio.sleep(0.05)
+            return "ترجمہ", 10
+
+        cache_manager = Mock()
+        with patch.object(routes.translator, "translate", side_effect=slow_translate) as translate, \
+                patch.object(routes.translator, "validate_translation", return_value=True):
+            leader = asyncio.create_task(
+                routes.translate_and_cache(cache_manager, "chapter-01", "urdu", "hash", "source")
+            )
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(
+                routes.translate_and_cache(cache_manager, "chapter-01", "urdu", "hash", "source")
+            )
+            await asyncio.sleep(0)
+            leader.cancel()
+
+            assert await waiter == ("ترجمہ", 10)
+
+        assert leader.cancelled()
+        assert translate.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_leader_running(self):
+        """Test cancelling a waiter cancels only the waiter, not the shared translation"""
+        import asyncio
+        from unittest.mock import Mock
+        from translate import routes
+
+        async def slow_translate(content, target_language):
+            await asyncio.sleep(0.05)
+            return "ترجمہ", 10
+
+        with patch.object(routes.translator, "translate", side_effect=slow_translate), \
+                patch.object(routes.translator, "validate_translation", return_value=True):
+            leader = asyncio.create_task(
+                routes.translate_and_cache(Mock(), "chapter-01", "urdu", "hash", "source")
+            )
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(
+                routes.translate_and_cache(Mock(), "chapter-01", "urdu", "hash", "source")
+            )
+            await asyncio.sleep(0)
+            waiter.cancel()
+
+            assert await leader == ("ترجمہ", 10)
+
+        assert waiter.cancelled()
+
+
+@pytest.fixture
+def signed_in():
+    """Authenticate every request as a fixed user without going through signup"""
+    from types import SimpleNamespace
+    from auth.routes import get_current_user
+
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1, email="translate_test@example.com")
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.fixture
+def translation_cache(db_engine):
+    """Cache manager on its own session against the test database"""
+    from sqlalchemy.orm import Session
+    from translate.cache_manager import TranslationCacheManager
+
+    with Session(db_engine) as db:
+        yield TranslationCacheManager(db)
+
+
+_STREAM_REQUEST = {
+    "chapter_id": "chapter-01",
+    "target_language": "urdu",
+    "source_content": "# Robots\n\nA robot senses and acts."
+}
+
+
+def _stream_hash():
+    from translate.routes import translator
+    from translate.cache_manager import TranslationCacheManager
+
+    return TranslationCacheManager.compute_content_hash(
+        _STREAM_REQUEST["source_content"], translator.glossary_version
+    )
+
+
+class TestTranslateStream:
+    """Test the streaming translation endpoint"""
+
+    def test_cache_hit_returns_cached_body(self, signed_in, translation_cache):
+        """Test a cached translation is sent whole without calling the LLM"""
+        from translate import routes
+
+        translation_cache.save_translation(
+            chapter_id="chapter-01",
+            language="urdu",
+            content_hash=_stream_hash(),
+            translated_content="# روبوٹس"
+        )
+
+        with patch.object(routes.translator, "translate_stream") as translate_stream:
+            response = client.post("/api/translate/stream", json=_STREAM_REQUEST)
+
+        assert response.status_code == 200
+        assert response.text == "# روبوٹس"
+        assert response.headers["content-type"].startswith("text/markdown")
+        translate_stream.assert_not_called()
+
+    def test_failure_before_first_piece_falls_back_to_source(self, signed_in, translation_cache):
+        """Test the source is sent when the stream fails before producing anything"""
+        from translate import routes
+
+        async def failing_stream(content, target_language):
+            raise RuntimeError("LLM unavailable")
+            yield
+
+        with patch.object(routes.translator, "translate_stream", failing_stream):
+            response = client.post("/api/translate/stream", json=_STREAM_REQUEST)
+
+        assert response.status_code == 200
+        assert response.text == _STREAM_REQUEST["source_content"]
+        assert translation_cache.get_cached_translation("chapter-01", "urdu", _stream_hash()) is None
+
+    def test_partial_output_is_not_cached(self, signed_in, translation_cache):
+        """Test a stream that fails midway is not written to the cache"""
+        from translate import routes
+
+        async def broken_stream(content, target_language):
+            yield "# روبوٹس\n\n"
+            raise RuntimeError("connection reset")
+
+        with patch.object(routes.translator, "translate_stream", broken_stream), \
+                patch.object(routes.translator, "validate_translation", return_value=True):
+            response = client.post("/api/translate/stream", json=_STREAM_REQUEST)
+
+        assert response.status_code == 200
+        assert response.text == "# روبوٹس\n\n"
+        assert translation_cache.get_cached_translation("chapter-01", "urdu", _stream_hash()) is None
+
+    def test_complete_stream_is_cached(self, signed_in, translation_cache):
+        """Test a finished, valid stream is cached through the overridden session factory"""
+        from translate import routes
+
+        async def good_stream(content, target_language):
+            yield "# روبوٹس\n\n"
+            yield "روبوٹ محسوس کرتا ہے۔"
+
+        with patch.object(routes.translator, "translate_stream", good_stream), \
+                patch.object(routes.translator, "validate_translation", return_value=True):
+            response = client.post("/api/translate/stream", json=_STREAM_REQUEST)
+
+        assert response.text == "# روبوٹس\n\nروبوٹ محسوس کرتا ہے۔"
+        cached = translation_cache.get_cached_translation("chapter-01", "urdu", _stream_hash())
+        assert cached.translated_content == response.text
+
+
+class TestTranslateBatch:
+    """Test the batch translation endpoint"""
+
+    def test_results_keep_request_order(self, signed_in):
+        """Test results come back in request order even when later items finish first"""
+        import asyncio
+        from translate import routes
+
+        async def translate(content, target_language):
+            # Earlier chapters take longer so completion order is reversed
+            await asyncio.sleep(0.01 * (5 - int(content[-1])))
+            return f"ترجمہ {content}", 1
+
+        items = [
+            {"chapter_id": f"chapter-0{i}", "source_content": f"chapter {i}"}
+            for i in range(1, 5)
+        ]
+        with patch.object(routes.translator, "translate", side_effect=translate), \
+                patch.object(routes.translator, "validate_translation", return_value=True):
+            response = client.post("/api/translate/batch", json={"items": items})
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["chapter_id"] for r in results] == [item["chapter_id"] for item in items]
+        assert [r["result"]["translated_content"] for r in results] == [
+            f"ترجمہ chapter {i}" for i in range(1, 5)
+        ]
+
+    def test_missing_chapter_fails_only_its_item(self, signed_in):
+        """Test an unknown chapter yields a per-item 404 beside successful items"""
+        from translate import routes
+
+        items = [
+            {"chapter_id": "chapter-01", "source_content": "A robot senses."},
+            {"chapter_id": "chapter-99"}
+        ]
+        with patch.object(routes.translator, "translate", return_value=("روبوٹ", 1)), \
+                patch.object(routes.translator, "validate_translation", return_value=True):
+            response = client.post("/api/translate/batch", json={"items": items})
+
+        assert response.status_code == 200
+        first, second = response.json()["results"]
+        assert first["status_code"] == 200
+        assert first["result"]["translated_content"] == "روبوٹ"
+        assert second["status_code"] == 404
+        assert second["result"] is None
+        assert "chapter-99" in second["error"]
+
+    @pytest.mark.parametrize("count", [0, 51])
+    def test_item_count_bounds(self, signed_in, count):
+        """Test batches must hold between 1 and 50 items"""
+        items = [{"chapter_id": "chapter-01"}] * count
+        response = client.post("/api/translate/batch", json={"items": items})
+
+        assert response.status_code == 422
@@ -5,28 +5,46 @@ Handles database operations for translation caching
 
 import hashlib
 import json
-from typing import Optional, Dict, Any, List
+import logging
+from typing import Optional, Dict, Any, List, Union
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, select, bindparam
 from auth.database import TranslationCache
 
+logger = logging.getLogger(__name__)
+
+# Cache row lookup, built once so SQLAlchemy compiles it once and reuses the compiled form
+_LOOKUP_STMT = (
+    select(TranslationCache)
+    .where(
+        TranslationCache.chapter_id == bindparam('chapter_id'),
+        TranslationCache.language == bindparam('language'),
+        TranslationCache.content_hash == bindparam('content_hash')
+    )
+    .limit(1)
+)
+
 class TranslationCacheManager:
     """Manages translation cache operations"""
 
     def __init__(self, db: Session):
         self.db = db
 
-    def compute_content_hash(self, content: str) -> str:
+    @staticmethod
+    def compute_content_hash(content: Union[str, bytes], version: str = "") -> str:
         """
         Compute MD5 hash of content for cache invalidation
 
         Args:
-            content: Source content string
+            content: Source content string, or its UTF-8 bytes when already at hand
+            version: Translator glossary/prompt version, hashed after the content
 
         Returns:
             MD5 hash (32 characters hex)
         """
-        return hashlib.md5(content.encode('utf-8')).hexdigest()
+        digest = hashlib.md5(content.encode('utf-8') if isinstance(content, str) else content)
+        digest.update(version.encode('utf-8'))
+        return digest.hexdigest()
 
     def get_cached_translation(
         self,
@@ -46,15 +64,15 @@ class TranslationCacheManager:
             TranslationCache object or None if cache miss
         """
         try:
-            cached = self.db.query(TranslationCache).filter(
-                TranslationCache.chapter_id == chapter_id,
-                TranslationCache.language == language,
-                TranslationCache.content_hash == content_hash
-            ).first()
+            cached = self.db.scalars(_LOOKUP_STMT, {
+                "chapter_id": chapter_id,
+                "language": language,
+                "content_hash": content_hash
+            }).first()
 
             return cached
-        except Exception as e:
-            print(f"Cache retrieval error: {str(e)}")
+        except Exception:
+            logger.exception("Cache retrieval error")
             return None
 
     def save_translation(
@@ -78,11 +96,11 @@ class TranslationCacheManager:
         """
         try:
             # Check if entry already exists
-            existing = self.db.query(TranslationCache).filter(
-                TranslationCache.chapter_id == chapter_id,
-                TranslationCache.language == language,
-                TranslationCache.content_hash == content_hash
-            ).first()
+            existing = self.db.scalars(_LOOKUP_STMT, {
+                "chapter_id": chapter_id,
+                "language": language,
+                "content_hash": content_hash
+            }).first()
 
             if existing:
                 # Update existing
@@ -101,8 +119,8 @@ class TranslationCacheManager:
             self.db.commit()
             return True
 
-        except Exception as e:
-            print(f"Cache save error: {str(e)}")
+        except Exception:
+            logger.exception("Cache save error")
             self.db.rollback()
             return False
 
@@ -125,8 +143,8 @@ class TranslationCacheManager:
             self.db.commit()
             return deleted_count
 
-        except Exception as e:
-            print(f"Cache invalidation error: {str(e)}")
+        except Exception:
+            logger.exception("Cache invalidation error")
             self.db.rollback()
             return 0
 
@@ -189,8 +207,8 @@ class TranslationCacheManager:
                 "last_updated": last_updated
             }
 
-        except Exception as e:
-            print(f"Stats retrieval error: {str(e)}")
+        except Exception:
+            logger.exception("Stats retrieval error")
             return {
                 "total_cached": 0,
                 "languages": [],
@@ -0,0 +1,62 @@
+"""
+Placeholder Masking
+Swaps spans the LLM must return verbatim for numbered placeholders and restores them.
+Standard library only, so demo mode can use it without the LLM client packages
+"""
+
+import re
+from typing import AsyncIterator, Tuple, List
+
+# Spans the LLM must return verbatim are swapped for §K<n>§ placeholders before sending:
+# fenced code, display and inline LaTeX, link targets (link text is still translated) and
+# any literal § so it cannot be confused with a placeholder. Inline LaTeX follows Pandoc:
+# no space inside either delimiter and no digit after the closing one, so "$5 or $10" is prose.
+# Link targets may contain one level of parentheses, as in Wikipedia URLs.
+_MASK_RX = re.compile(
+    r"```.*?```|\$\$.*?\$\$|\$(?=\S)[^$\n]+(?<=\S)\$(?!\d)"
+    r"|(?<=\])\((?:[^()\n]|\([^()\n]*\))+\)|§",
+    re.S
+)
+_SLOT_RX = re.compile(r"§K(\d+)§")
+# End of streamed text: a complete placeholder, or one cut off as "§", "§K" or "§K12"
+_TAIL_SLOT_RX = re.compile(r"§K\d+§$|(?P<partial>§(?:K\d*)?)$")
+
+def mask(text: str) -> Tuple[str, List[str]]:
+    """
+    Replace preserved spans with numbered placeholders
+
+    Args:
+        text: Markdown to mask
+
+    Returns:
+        Tuple of (masked text, original spans indexed by placeholder number)
+    """
+    slots = []
+
+    def stash(match):
+        slots.append(match.group())
+        return f"§K{len(slots) - 1}§"
+
+    return _MASK_RX.sub(stash, text), slots
+
+def unmask(text: str, slots: List[str]) -> str:
+    """Put the original spans back; unknown placeholder numbers are left as-is"""
+    def restore(match):
+        index = int(match.group(1))
+        return slots[index] if index < len(slots) else match.group()
+
+    return _SLOT_RX.sub(restore, text)
+
+async def unmask_stream(pieces: AsyncIterator[str], slots: List[str]) -> AsyncIterator[str]:
+    """Unmask streamed text, holding back any placeholder split across pieces"""
+    pending = ""
+    async for piece in pieces:
+        pending += piece
+        # Only a trailing, possibly incomplete placeholder is held back for the next piece
+        tail = _TAIL_SLOT_RX.search(pending)
+        cut = tail.start() if tail and tail.group("partial") else len(pending)
+        if cut:
+            yield unmask(pending[:cut], slots)
+            pending = pending[cut:]
+    if pending:
+        yield unmask(pending, slots)
@@ -2,22 +2,63 @@
 Pydantic models for translation API
 """
 
-from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional, List
+import functools
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Optional, List
 
 class TranslateRequest(BaseModel):
     """Request model for chapter translation"""
-    chapter_id: str = Field(..., description="Chapter ID to translate", pattern=r'^chapter-\d{2}$')
+    chapter_id: str = Field(..., description="Chapter ID to translate (chapter-NN)")
     target_language: str = Field(default="urdu", description="Target language code")
     source_content: Optional[str] = Field(None, description="Optional custom content to translate")
 
-    class Config:
-        json_schema_extra = {
+    @field_validator("chapter_id")
+    @classmethod
+    def check_chapter_id(cls, value: str) -> str:
+        """
+        Check the chapter-NN format with fixed-offset comparisons instead of a regex
+
+        Raises:
+            ValueError: If chapter_id is not "chapter-" followed by two ASCII digits
+        """
+        digits = value[8:]
+        if len(value) == 10 and value.startswith("chapter-") and digits.isascii() and digits.isdigit():
+            return value
+        raise ValueError("invalid chapter_id")
+
+    # Frozen so validated instances can be shared (see make_request)
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "chapter_id": "chapter-01",
                 "target_language": "urdu"
             }
         }
+    )
+
+@functools.lru_cache(maxsize=256)
+def make_request(chapter_id: str, target_language: str = "urdu") -> TranslateRequest:
+    """
+    Build a TranslateRequest, validating each (chapter_id, target_language) pair only once
+
+    Args:
+        chapter_id: Chapter identifier (chapter-NN)
+        target_language: Target language code
+
+    Returns:
+        Shared, frozen TranslateRequest instance
+    """
+    return TranslateRequest(chapter_id=chapter_id, target_language=target_language)
+
+class TranslateMeta(BaseModel):
+    """Per-translation metadata"""
+    processing_time_ms: int
+    content_hash: str
+    llm_provider: Optional[str] = None  # None for cache hits and fallbacks
+    tokens_used: int
+    fallback_used: bool
+    fallback_reason: Optional[str] = None
 
 class TranslateResponse(BaseModel):
     """Response model for translation"""
@@ -25,10 +66,13 @@ class TranslateResponse(BaseModel):
     target_language: str
     translated_content: str
     cached: bool
-    metadata: Dict[str, Any]
+    metadata: TranslateMeta
 
-    class Config:
-        json_schema_extra = {
+    # Response-only: never mutated after construction
+    model_config = ConfigDict(
+        frozen=True,
+        from_attributes=True,
+        json_schema_extra={
             "example": {
                 "original_chapter_id": "chapter-01",
                 "target_language": "urdu",
@@ -43,18 +87,54 @@ class TranslateResponse(BaseModel):
                 }
             }
         }
+    )
+
+class BatchTranslateRequest(BaseModel):
+    """Request model for translating several chapters in one call"""
+    items: List[TranslateRequest] = Field(..., min_length=1, max_length=50, description="Chapters to translate")
+
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
+            "example": {
+                "items": [
+                    {"chapter_id": "chapter-01", "target_language": "urdu"},
+                    {"chapter_id": "chapter-02", "target_language": "urdu"}
+                ]
+            }
+        }
+    )
+
+class BatchTranslateItem(BaseModel):
+    """Outcome for one chapter of a batch; result is None when status_code is not 200"""
+    chapter_id: str
+    status_code: int
+    result: Optional[TranslateResponse] = None
+    error: Optional[str] = None
+
+class BatchTranslateResponse(BaseModel):
+    """Response model for batch translation, in request order"""
+    results: List[BatchTranslateItem]
+
+class LanguageCount(BaseModel):
+    """Cached translation count for one language"""
+    language: str
+    count: int
 
 class CacheStatsResponse(BaseModel):
     """Cache statistics response"""
     total_cached: int
-    languages: List[Dict[str, Any]]
+    languages: List[LanguageCount]
     chapters_cached: List[str]
     hit_rate: float
     total_size_kb: float
     last_updated: Optional[str] = None
 
-    class Config:
-        json_schema_extra = {
+    # Response-only: never mutated after construction
+    model_config = ConfigDict(
+        frozen=True,
+        from_attributes=True,
+        json_schema_extra={
             "example": {
                 "total_cached": 15,
                 "languages": [{"language": "urdu", "count": 15}],
@@ -64,3 +144,4 @@ class CacheStatsResponse(BaseModel):
                 "last_updated": "2025-12-13T14:30:00Z"
             }
         }
+    )
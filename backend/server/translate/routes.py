@@ -1,26 +1,46 @@
 """
 Translation API Routes
-Endpoints: POST /api/translate, GET /api/translate/cache-stats, DELETE /api/translate/cache/{chapter_id}
+Endpoints: POST /api/translate, POST /api/translate/batch, POST /api/translate/stream,
+GET /api/translate/cache-stats, DELETE /api/translate/cache/{chapter_id}
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.background import BackgroundTask
 from pathlib import Path
+import asyncio
+import functools
+import logging
 import time
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 
-from auth.database import get_db, User
+from auth.database import get_db, get_session_factory, User
 from auth.routes import get_current_user
-from .models import TranslateRequest, TranslateResponse, CacheStatsResponse
+from .models import (
+    TranslateRequest, TranslateResponse, TranslateMeta, CacheStatsResponse,
+    BatchTranslateRequest, BatchTranslateItem, BatchTranslateResponse
+)
 from .translator import UrduTranslator
 from .cache_manager import TranslationCacheManager
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # Initialize translator (singleton)
 translator = UrduTranslator()
 
-def load_chapter(chapter_id: str) -> str:
+DOCS_PATH = Path(__file__).parent.parent.parent / "docs"
+
+@functools.lru_cache(maxsize=64)
+def _read_chapter_cached(path_str: str, mtime_ns: int) -> Tuple[str, str]:
+    """Read and hash a chapter file; mtime_ns is part of the cache key so edits are picked up"""
+    # Hash the bytes as read rather than re-encoding the decoded text; UTF-8 decoding
+    # round-trips exactly, so the digest is the same
+    data = Path(path_str).read_bytes()
+    return data.decode("utf-8"), TranslationCacheManager.compute_content_hash(data, translator.glossary_version)
+
+def load_chapter(chapter_id: str) -> Tuple[str, str]:
     """
     Load chapter content from docs/ directory
 
@@ -28,19 +48,81 @@ def load_chapter(chapter_id: str) -> str:
         chapter_id: Chapter identifier (e.g., 'chapter-01')
 
     Returns:
-        Chapter markdown content
+        Tuple of (chapter markdown content, content hash)
 
     Raises:
         FileNotFoundError: If chapter file doesn't exist
     """
-    docs_path = Path(__file__).parent.parent.parent / "docs"
-    chapter_file = docs_path / f"{chapter_id}.md"
+    chapter_file = DOCS_PATH / f"{chapter_id}.md"
 
-    if not chapter_file.exists():
+    try:
+        st = chapter_file.stat()
+    except FileNotFoundError:
         raise FileNotFoundError(f"Chapter {chapter_id} not found")
 
-    with open(chapter_file, 'r', encoding='utf-8') as f:
-        return f.read()
+    return _read_chapter_cached(str(chapter_file), st.st_mtime_ns)
+
+# Cache misses currently being translated, keyed by (chapter_id, language, content_hash)
+# Check-and-insert has no await in between, so the event loop makes it atomic without a lock
+_inflight: Dict[Tuple[str, str, str], asyncio.Future] = {}
+
+async def translate_and_cache(
+    cache_manager: TranslationCacheManager,
+    chapter_id: str,
+    language: str,
+    content_hash: str,
+    source_content: str
+) -> Tuple[str, int]:
+    """
+    Translate, validate and cache content, coalescing concurrent identical misses
+
+    The first caller for a key does the work; callers arriving while it runs
+    await the same result instead of paying for another LLM call. If that caller
+    is cancelled (e.g. its client disconnected), a waiting caller takes over.
+
+    Returns:
+        Tuple of (translated_content, tokens_used)
+    """
+    key = (chapter_id, language, content_hash)
+    while (pending := _inflight.get(key)) is not None:
+        # wait() neither cancels the shared future when we are cancelled nor raises when it
+        # is; our own cancellation still propagates from the await
+        await asyncio.wait((pending,))
+        if not pending.cancelled():
+            return pending.result()
+        # Only the leader was cancelled: look again and lead if no one else has
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        translated_content, tokens_used = await translator.translate(
+            content=source_content,
+            target_language=language
+        )
+
+        if not translator.validate_translation(source_content, translated_content):
+            raise ValueError("Translation validation failed")
+
+        await asyncio.to_thread(
+            cache_manager.save_translation,
+            chapter_id=chapter_id,
+            language=language,
+            content_hash=content_hash,
+            translated_content=translated_content
+        )
+
+        future.set_result((translated_content, tokens_used))
+        return translated_content, tokens_used
+
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # mark retrieved so an unawaited failure is not logged
+        raise
+    finally:
+        _inflight.pop(key, None)
 
 @router.post("/translate", response_model=TranslateResponse)
 async def translate_chapter(
@@ -57,6 +139,15 @@ async def translate_chapter(
 
     **Returns**: Translated markdown content with metadata
     """
+    return await _translate_one(request, db)
+
+async def _translate_one(request: TranslateRequest, db: Session) -> TranslateResponse:
+    """
+    Translate one chapter, serving from and filling the translation cache
+
+    Raises:
+        HTTPException: 404 for unknown chapters, 400 for invalid input, 500 otherwise
+    """
     start_time = time.time()
 
     try:
@@ -67,15 +158,14 @@ async def translate_chapter(
         if request.source_content:
             # Custom content provided (e.g., personalized variant)
             source_content = request.source_content
+            content_hash = cache_manager.compute_content_hash(source_content, translator.glossary_version)
         else:
-            # Load original chapter
-            source_content = load_chapter(request.chapter_id)
-
-        # Compute content hash for cache key
-        content_hash = cache_manager.compute_content_hash(source_content)
+            # Load original chapter off the event loop; its hash is memoized with the content
+            source_content, content_hash = await asyncio.to_thread(load_chapter, request.chapter_id)
 
-        # Check cache first
-        cached_entry = cache_manager.get_cached_translation(
+        # Check cache first; the session is synchronous, so query from a worker thread
+        cached_entry = await asyncio.to_thread(
+            cache_manager.get_cached_translation,
             chapter_id=request.chapter_id,
             language=request.target_language,
             content_hash=content_hash
@@ -85,38 +175,31 @@ async def translate_chapter(
             # Cache hit!
             response_time_ms = int((time.time() - start_time) * 1000)
 
-            return TranslateResponse(
+            # Every field is already known-valid here, so skip validation
+            return TranslateResponse.model_construct(
                 original_chapter_id=request.chapter_id,
                 target_language=request.target_language,
                 translated_content=cached_entry.translated_content,
                 cached=True,
-                metadata={
-                    "processing_time_ms": response_time_ms,
-                    "content_hash": content_hash,
-                    "llm_provider": None,
-                    "tokens_used": 0,
-                    "fallback_used": False
-                }
+                metadata=TranslateMeta.model_construct(
+                    processing_time_ms=response_time_ms,
+                    content_hash=content_hash,
+                    llm_provider=None,
+                    tokens_used=0,
+                    fallback_used=False,
+                    fallback_reason=None
+                )
             )
 
         # Cache miss - generate translation
         try:
-            # Call LLM for translation
-            translated_content, tokens_used = await translator.translate(
-                content=source_content,
-                target_language=request.target_language
-            )
-
-            # Validate translation
-            if not translator.validate_translation(source_content, translated_content):
-                raise ValueError("Translation validation failed")
-
-            # Save to cache
-            cache_manager.save_translation(
+            # Call LLM, validate and save; shared with concurrent requests for the same content
+            translated_content, tokens_used = await translate_and_cache(
+                cache_manager,
                 chapter_id=request.chapter_id,
                 language=request.target_language,
                 content_hash=content_hash,
-                translated_content=translated_content
+                source_content=source_content
             )
 
             response_time_ms = int((time.time() - start_time) * 1000)
@@ -137,7 +220,7 @@ async def translate_chapter(
 
         except Exception as e:
             # Fallback to original content on translation error
-            print(f"Translation error: {str(e)}")
+            logger.exception("Translation error")
 
             response_time_ms = int((time.time() - start_time) * 1000)
 
@@ -172,6 +255,147 @@ async def translate_chapter(
             detail=f"Translation failed: {str(e)}"
         )
 
+# Chapters of one batch translated at the same time
+BATCH_MAX_PARALLEL = 4
+
+async def _translate_batch_item(
+    request: TranslateRequest,
+    semaphore: asyncio.Semaphore,
+    session_factory
+) -> BatchTranslateItem:
+    """Translate one batch entry on its own session and wrap the outcome"""
+    async with semaphore:
+        # Entries run concurrently and a Session is not safe to share, so each gets its own
+        with session_factory() as db:
+            try:
+                result = await _translate_one(request, db)
+            except HTTPException as e:
+                return BatchTranslateItem(
+                    chapter_id=request.chapter_id,
+                    status_code=e.status_code,
+                    error=e.detail
+                )
+
+    return BatchTranslateItem(chapter_id=request.chapter_id, status_code=200, result=result)
+
+@router.post("/translate/batch", response_model=BatchTranslateResponse)
+async def translate_batch(
+    request: BatchTranslateRequest,
+    current_user: User = Depends(get_current_user),
+    session_factory = Depends(get_session_factory)
+):
+    """
+    Translate several chapters in one call
+
+    **Authentication Required**: JWT bearer token
+
+    **Returns**: One entry per requested chapter, in request order; a failed chapter
+    carries its status code and error instead of a result
+    """
+    semaphore = asyncio.Semaphore(BATCH_MAX_PARALLEL)
+    results = await asyncio.gather(*(
+        _translate_batch_item(item, semaphore, session_factory) for item in request.items
+    ))
+    return BatchTranslateResponse(results=list(results))
+
+def _save_streamed_translation(
+    session_factory,
+    chapter_id: str,
+    language: str,
+    content_hash: str,
+    translated_content: str
+) -> None:
+    """Cache a streamed translation"""
+    # The request-scoped session is closed before a streamed body is sent, so use our own
+    with session_factory() as db:
+        TranslationCacheManager(db).save_translation(
+            chapter_id=chapter_id,
+            language=language,
+            content_hash=content_hash,
+            translated_content=translated_content
+        )
+
+@router.post("/translate/stream")
+async def translate_chapter_stream(
+    request: TranslateRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    session_factory = Depends(get_session_factory)
+):
+    """
+    Translate chapter to target language (Urdu), streaming markdown as it is generated
+
+    **Authentication Required**: JWT bearer token
+
+    **Returns**: text/markdown body; cached translations are sent in one piece
+    """
+    try:
+        cache_manager = TranslationCacheManager(db)
+
+        if request.source_content:
+            source_content = request.source_content
+            content_hash = cache_manager.compute_content_hash(source_content, translator.glossary_version)
+        else:
+            source_content, content_hash = await asyncio.to_thread(load_chapter, request.chapter_id)
+
+        cached_entry = await asyncio.to_thread(
+            cache_manager.get_cached_translation,
+            chapter_id=request.chapter_id,
+            language=request.target_language,
+            content_hash=content_hash
+        )
+
+    except FileNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    if cached_entry:
+        return Response(cached_entry.translated_content, media_type="text/markdown")
+
+    parts: List[str] = []
+    finished = asyncio.Event()
+
+    async def generate():
+        try:
+            async for piece in translator.translate_stream(source_content, request.target_language):
+                parts.append(piece)
+                yield piece
+        except Exception:
+            logger.exception("Translation error")
+            # Nothing sent yet: fall back to the original content, as the JSON endpoint does
+            if not parts:
+                yield source_content
+            return
+        finished.set()
+
+    async def cache_result():
+        # Skip partial output from a failed stream or a client that disconnected
+        if not finished.is_set():
+            return
+        translated_content = "".join(parts)
+        if translator.validate_translation(source_content, translated_content):
+            await asyncio.to_thread(
+                _save_streamed_translation,
+                session_factory,
+                request.chapter_id,
+                request.target_language,
+                content_hash,
+                translated_content
+            )
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/markdown",
+        background=BackgroundTask(cache_result)
+    )
+
 @router.get("/translate/cache-stats", response_model=CacheStatsResponse)
 async def get_translation_cache_stats(
     current_user: User = Depends(get_current_user),
@@ -235,8 +459,11 @@ async def translation_health():
         "supported_languages": ["urdu"],
         "llm_provider": translator.llm_provider,
         "glossary_terms": len(translator.glossary_terms),
+        "glossary_version": translator.glossary_version,
         "endpoints": {
             "translate": "POST /api/translate",
+            "translate_batch": "POST /api/translate/batch",
+            "translate_stream": "POST /api/translate/stream",
             "cache_stats": "GET /api/translate/cache-stats",
             "invalidate_cache": "DELETE /api/translate/cache/{chapter_id}"
         }
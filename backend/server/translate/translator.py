@@ -4,11 +4,95 @@ Handles translation with technical term preservation
 """
 
 import os
-import json
+import re
+import logging
+import asyncio
+import hashlib
+from collections import Counter
 from pathlib import Path
-from typing import Tuple, List
+from typing import AsyncIterator, Tuple, List
 import anthropic
-from openai import OpenAI
+import httpx
+import orjson
+from openai import AsyncOpenAI
+
+from .masking import mask, unmask, unmask_stream
+
+logger = logging.getLogger(__name__)
+
+# Markdown constructs that must survive translation: code fences, LaTeX delimiters, links
+_PRESERVED_RX = re.compile(r"```|\$|\]\(")
+
+def _preserved_counts(text: str) -> Counter:
+    """Tally every preserved construct in a single scan of text"""
+    return Counter(_PRESERVED_RX.findall(text))
+
+# Connection pool shared by both LLM SDKs; HTTP/2 multiplexes concurrent chunk requests.
+# Non-streamed chapter translations send nothing until done, hence the long read timeout
+_HTTP_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=100)
+_HTTP_TIMEOUT = httpx.Timeout(300.0, connect=5.0)
+
+async def _trim_stream(pieces: AsyncIterator[str]) -> AsyncIterator[str]:
+    """
+    Drop leading and trailing whitespace from streamed text, like str.strip on the whole
+
+    Only the current piece and any held-back whitespace are ever copied, never the response.
+    """
+    started = False
+    trailing = ""
+    async for piece in pieces:
+        if not started:
+            piece = piece.lstrip()
+            if not piece:
+                continue
+            started = True
+        body = piece.rstrip()
+        if body:
+            yield trailing + body
+            trailing = piece[len(body):]
+        else:
+            trailing += piece
+
+# Long chapters are split on "## " headings into chunks of roughly this size,
+# translated concurrently with at most MAX_PARALLEL_CHUNKS calls in flight
+MAX_CHUNK_CHARS = 8000
+MAX_PARALLEL_CHUNKS = 8
+
+def split_markdown(content: str, max_chars: int = MAX_CHUNK_CHARS) -> List[str]:
+    """
+    Split markdown into chunks on level-2 heading boundaries
+
+    Headings inside fenced code blocks are not treated as boundaries. Adjacent
+    sections are packed together up to max_chars; a single longer section is
+    kept whole rather than cut mid-section.
+
+    Args:
+        content: Markdown content to split
+        max_chars: Soft upper bound on chunk length
+
+    Returns:
+        List of chunks that concatenate back to content
+    """
+    sections = []
+    current = []
+    in_fence = False
+    for line in content.splitlines(keepends=True):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        elif not in_fence and line.startswith("## ") and current:
+            sections.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("".join(current))
+
+    chunks = []
+    for section in sections:
+        if chunks and len(chunks[-1]) + len(section) <= max_chars:
+            chunks[-1] += section
+        else:
+            chunks.append(section)
+    return chunks
 
 class UrduTranslator:
     """LLM-based translator for technical content"""
@@ -19,42 +103,68 @@ class UrduTranslator:
         self.claude_api_key = os.getenv("CLAUDE_API_KEY")
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
 
+        # API clients are built once so their connection pools are reused across calls;
+        # without an API key there is nothing to call, so no pool is opened
+        self._http = httpx.AsyncClient(
+            http2=True, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT
+        ) if self.claude_api_key or self.openai_api_key else None
+        self._claude = anthropic.AsyncAnthropic(
+            api_key=self.claude_api_key,
+            http_client=self._http,
+            timeout=_HTTP_TIMEOUT
+        ) if self.claude_api_key else None
+        self._openai = AsyncOpenAI(
+            api_key=self.openai_api_key,
+            http_client=self._http,
+            timeout=_HTTP_TIMEOUT
+        ) if self.openai_api_key else None
+
         # Load glossary
         glossary_path = Path(__file__).parent / "glossary.json"
-        with open(glossary_path, 'r', encoding='utf-8') as f:
-            self.glossary_data = json.load(f)
+        self.glossary_data = orjson.loads(glossary_path.read_bytes())
 
         # Flatten all terms
         self.glossary_terms = self._flatten_glossary()
 
-    def _flatten_glossary(self) -> List[str]:
-        """Flatten glossary categories into single list"""
-        terms = []
+        # The instructions around the content never change, so render them once
+        self._prompt_prefix, self._prompt_suffix = self._build_prompt_affixes()
+
+        # Short fingerprint of the glossary and prompt; folded into cache keys so edits
+        # to either invalidate previously cached translations
+        fingerprint = hashlib.sha256(orjson.dumps(self.glossary_data, option=orjson.OPT_SORT_KEYS))
+        fingerprint.update((self._prompt_prefix + self._prompt_suffix).encode("utf-8"))
+        self.glossary_version = fingerprint.hexdigest()[:8]
+
+    async def aclose(self) -> None:
+        """Close the shared connection pool; call once on application shutdown"""
+        if self._http is not None:
+            await self._http.aclose()
+
+    def _flatten_glossary(self) -> Tuple[str, ...]:
+        """Flatten glossary categories into a sorted, de-duplicated tuple"""
+        terms = set()
         for category, term_list in self.glossary_data["categories"].items():
-            terms.extend(term_list)
-        return list(set(terms))  # Remove duplicates
+            terms.update(term_list)
+        return tuple(sorted(terms))
 
-    def build_translation_prompt(self, content: str) -> str:
+    def _build_prompt_affixes(self) -> Tuple[str, str]:
         """
-        Build LLM prompt for translation
-
-        Args:
-            content: English markdown content to translate
+        Render the static text placed before and after the chapter content
 
         Returns:
-            Complete prompt with instructions and content
+            Tuple of (prefix, suffix)
         """
-        # Build glossary string (first 100 terms for brevity)
-        glossary_sample = ", ".join(self.glossary_terms[:100])
-        if len(self.glossary_terms) > 100:
-            glossary_sample += f", ... and {len(self.glossary_terms) - 100} more"
+        # The full glossary; it also lifts the prefix past the 1024-token minimum Claude
+        # needs before a cache_control block is actually cached
+        glossary_list = ", ".join(self.glossary_terms)
 
-        prompt = f"""You are an expert technical translator specializing in robotics and AI content.
+        prefix = f"""You are an expert technical translator specializing in robotics and AI content.
 
 Translate the following English textbook chapter to Urdu. Follow these CRITICAL RULES:
 
 1. PRESERVATION RULES (NEVER TRANSLATE THESE):
-   - Technical terms: {glossary_sample}
+   - Placeholders like §K0§ (copy them exactly; they stand for code, equations and link URLs)
+   - Technical terms: {glossary_list}
    - Code blocks (```...```)
    - LaTeX equations ($...$ and $$...$$)
    - Function names, variable names, class names
@@ -88,13 +198,26 @@ IMPORTANT: Return ONLY the translated markdown. Do not add explanations, notes,
 
 CONTENT TO TRANSLATE:
 
-{content}
+"""
+        suffix = """
 
 ---
 
 TRANSLATED URDU MARKDOWN:
 """
-        return prompt
+        return prefix, suffix
+
+    def build_translation_prompt(self, content: str) -> str:
+        """
+        Build LLM prompt for translation
+
+        Args:
+            content: English markdown content to translate
+
+        Returns:
+            Complete prompt with instructions and content
+        """
+        return self._prompt_prefix + content + self._prompt_suffix
 
     async def translate(self, content: str, target_language: str = "urdu") -> Tuple[str, int]:
         """
@@ -110,54 +233,180 @@ TRANSLATED URDU MARKDOWN:
         if target_language != "urdu":
             raise ValueError(f"Unsupported target language: {target_language}")
 
-        # Build prompt
-        prompt = self.build_translation_prompt(content)
+        # Translate sections concurrently, bounded so one chapter cannot flood the provider
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_CHUNKS)
+
+        async def translate_chunk(chunk: str) -> Tuple[str, int]:
+            # Preserved spans never reach the LLM, so it does not spend tokens re-emitting them;
+            # a dropped placeholder still fails validate_translation's counts after unmasking
+            masked, slots = mask(chunk)
+            async with semaphore:
+                text, tokens = await self._translate_chunk(masked)
+            return unmask(text, slots), tokens
 
+        results = await asyncio.gather(*(translate_chunk(chunk) for chunk in split_markdown(content)))
+
+        translated_content = "\n\n".join(text for text, _ in results)
+        tokens_used = sum(tokens for _, tokens in results)
+        return translated_content, tokens_used
+
+    async def _translate_chunk(self, content: str) -> Tuple[str, int]:
+        """
+        Translate one chunk with the configured provider, falling back to OpenAI
+
+        Args:
+            content: Markdown chunk to translate
+
+        Returns:
+            Tuple of (translated_content, tokens_used)
+        """
         # Try primary provider (Claude)
         if self.llm_provider == "claude" and self.claude_api_key:
             try:
-                return await self._call_claude(prompt)
+                return await self._call_claude(content)
             except Exception as e:
-                print(f"Claude translation failed: {str(e)}")
+                logger.warning("Claude translation failed: %s", e)
                 # Fall back to OpenAI
                 if self.openai_api_key:
-                    print("Falling back to OpenAI...")
-                    return await self._call_openai(prompt)
+                    logger.info("Falling back to OpenAI")
+                    return await self._call_openai(content)
                 else:
                     raise
 
         # Use OpenAI
         elif self.openai_api_key:
-            return await self._call_openai(prompt)
+            return await self._call_openai(content)
 
         else:
             raise ValueError("No LLM API key configured. Set CLAUDE_API_KEY or OPENAI_API_KEY")
 
-    async def _call_claude(self, prompt: str) -> Tuple[str, int]:
+    def _claude_params(self, content: str) -> dict:
+        """Request arguments for a Claude translation call"""
+        return {
+            "model": "claude-3-5-sonnet-20241022",
+            "max_tokens": 16000,  # Long enough for full chapter
+            "temperature": 0.3,  # Lower for consistency
+            "system": "You are an expert technical translator for robotics and AI textbooks.",
+            "messages": [
+                {
+                    "role": "user",
+                    # Same text as build_translation_prompt; the fixed instructions (over
+                    # 1024 tokens with the full glossary) are a separate block marked
+                    # cacheable so Claude reuses them across calls
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": self._prompt_prefix,
+                            "cache_control": {"type": "ephemeral"}
+                        },
+                        {
+                            "type": "text",
+                            "text": content + self._prompt_suffix
+                        }
+                    ]
+                }
+            ]
+        }
+
+    def _openai_params(self, content: str) -> dict:
+        """Request arguments for an OpenAI translation call"""
+        return {
+            "model": "gpt-4-turbo-preview",
+            "max_tokens": 4000,
+            "temperature": 0.3,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are an expert technical translator for robotics and AI textbooks."
+                },
+                {
+                    "role": "user",
+                    "content": self.build_translation_prompt(content)
+                }
+            ]
+        }
+
+    async def translate_stream(self, content: str, target_language: str = "urdu") -> AsyncIterator[str]:
+        """
+        Translate content, yielding text as the provider generates it
+
+        Chunks from split_markdown are translated one after another so the
+        output arrives in document order.
+
+        Args:
+            content: Source English content
+            target_language: Target language (default: urdu)
+
+        Yields:
+            Pieces of translated markdown
+        """
+        if target_language != "urdu":
+            raise ValueError(f"Unsupported target language: {target_language}")
+
+        for index, chunk in enumerate(split_markdown(content)):
+            if index:
+                yield "\n\n"
+            masked, slots = mask(chunk)
+            # Trimmed like the non-streamed path's strip(), piece by piece
+            async for piece in unmask_stream(_trim_stream(self._stream_chunk(masked)), slots):
+                yield piece
+
+    async def _stream_chunk(self, content: str) -> AsyncIterator[str]:
+        """
+        Stream one chunk's translation from the configured provider, falling back to OpenAI
+
+        The fallback only happens before any text was yielded; output already
+        sent to the client cannot be taken back.
+        """
+        if self.llm_provider == "claude" and self.claude_api_key:
+            started = False
+            try:
+                async for piece in self._stream_claude(content):
+                    started = True
+                    yield piece
+                return
+            except Exception as e:
+                logger.warning("Claude translation failed: %s", e)
+                if started or not self.openai_api_key:
+                    raise
+                logger.info("Falling back to OpenAI")
+
+            async for piece in self._stream_openai(content):
+                yield piece
+
+        elif self.openai_api_key:
+            async for piece in self._stream_openai(content):
+                yield piece
+
+        else:
+            raise ValueError("No LLM API key configured. Set CLAUDE_API_KEY or OPENAI_API_KEY")
+
+    async def _stream_claude(self, content: str) -> AsyncIterator[str]:
+        """Yield text deltas from a streamed Claude response"""
+        stream = await self._claude.messages.create(**self._claude_params(content), stream=True)
+        async for event in stream:
+            if event.type == "content_block_delta":
+                yield event.delta.text
+
+    async def _stream_openai(self, content: str) -> AsyncIterator[str]:
+        """Yield text deltas from a streamed OpenAI response"""
+        stream = await self._openai.chat.completions.create(**self._openai_params(content), stream=True)
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def _call_claude(self, content: str) -> Tuple[str, int]:
         """
         Call Claude API for translation
 
         Args:
-            prompt: Complete translation prompt
+            content: Markdown chunk to translate
 
         Returns:
             Tuple of (translated_content, tokens_used)
         """
         try:
-            client = anthropic.Anthropic(api_key=self.claude_api_key)
-
-            response = client.messages.create(
-                model="claude-3-5-sonnet-20241022",
-                max_tokens=16000,  # Long enough for full chapter
-                temperature=0.3,  # Lower for consistency
-                system="You are an expert technical translator for robotics and AI textbooks.",
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
+            response = await self._claude.messages.create(**self._claude_params(content))
 
             translated_content = response.content[0].text.strip()
 
@@ -169,34 +418,18 @@ TRANSLATED URDU MARKDOWN:
         except Exception as e:
             raise Exception(f"Claude API error: {str(e)}")
 
-    async def _call_openai(self, prompt: str) -> Tuple[str, int]:
+    async def _call_openai(self, content: str) -> Tuple[str, int]:
         """
         Call OpenAI API for translation
 
         Args:
-            prompt: Complete translation prompt
+            content: Markdown chunk to translate
 
         Returns:
             Tuple of (translated_content, tokens_used)
         """
         try:
-            client = OpenAI(api_key=self.openai_api_key)
-
-            response = client.chat.completions.create(
-                model="gpt-4-turbo-preview",
-                max_tokens=4000,
-                temperature=0.3,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert technical translator for robotics and AI textbooks."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
+            response = await self._openai.chat.completions.create(**self._openai_params(content))
 
             translated_content = response.choices[0].message.content.strip()
 
@@ -223,23 +456,14 @@ TRANSLATED URDU MARKDOWN:
         if not translated or len(translated.strip()) < 10:
             return False
 
-        # Check 2: Code blocks preserved (count should match)
-        original_code_blocks = original.count("```")
-        translated_code_blocks = translated.count("```")
-        if original_code_blocks != translated_code_blocks:
-            return False
-
-        # Check 3: LaTeX equations preserved
-        original_latex = original.count("$")
-        translated_latex = translated.count("$")
-        if original_latex != translated_latex:
-            return False
-
-        # Check 4: Links preserved
-        original_links = original.count("](")
-        translated_links = translated.count("](")
-        if original_links != translated_links:
-            return False
-
-        # Validation passed
-        return True
+        # Checks 2-4: code blocks, LaTeX equations and links preserved (counts should match)
+        # Scan the translation against the original's tallies and stop at the first surplus
+        remaining = _preserved_counts(original)
+        for match in _PRESERVED_RX.finditer(translated):
+            token = match.group()
+            if not remaining[token]:
+                return False
+            remaining[token] -= 1
+
+        # Validation passed if nothing from the original went missing
+        return not any(remaining.values())